@@ -6,6 +6,7 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
 
 from app.services.data_service import address_service
+from app.utils.json_utils import json_response
 from app.models.address import Address, AddressCreate
 
 router = APIRouter()
@@ -13,7 +14,7 @@ router = APIRouter()
 @router.get("", response_model=List[Dict[str, Any]])
 async def get_addresses():
     """Get all addresses"""
-    return await address_service.get_all_addresses()
+    return json_response(await address_service.get_all_addresses())
 
 @router.get("/{address_id}", response_model=Dict[str, Any])
 async def get_address(address_id: str):
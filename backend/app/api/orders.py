@@ -9,6 +9,7 @@ from app.models.order import Order
 from app.models.product import OrderStatistics
 from app.services.data_service import order_service
 from app.utils.logger import get_logger
+from app.utils.json_utils import json_response
 
 logger = get_logger("api.orders")
 
@@ -64,15 +65,15 @@ async def delete_batch(batch_id: str):
 
 @router.get("/batches/history")
 async def get_batch_history():
-    """Get history of all order batches"""
-    return await order_service.get_all_batches()
+    """Get history of all order batches with per-status counts"""
+    return await order_service.get_batches_with_stats()
 
 @router.get("/{order_id}/logs")
 async def get_order_logs(order_id: str):
     """Get logs for a specific order"""
     from app.services.data_service import log_service
     logs = await log_service.get_logs_by_order(order_id)
-    return logs
+    return json_response(logs)
 
 @router.get("/statistics/all", response_model=OrderStatistics)
 async def get_order_statistics():
@@ -6,6 +6,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict, Any
 
 from app.services.data_service import product_service
+from app.utils.json_utils import json_response
 from app.models.product import Product, ProductCreate, ProductUpdate
 
 router = APIRouter()
@@ -13,7 +14,7 @@ router = APIRouter()
 @router.get("", response_model=List[Dict[str, Any]])
 async def get_products():
     """Get all products"""
-    return await product_service.get_all_products()
+    return json_response(await product_service.get_all_products())
 
 @router.get("/{product_id}", response_model=Dict[str, Any])
 async def get_product(product_id: str):
@@ -2,27 +2,34 @@
 Tira Users API router
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Dict, Any, Optional
 
 from app.services.data_service import user_service
+from app.utils.json_utils import json_response
 from app.models.tira_user import TiraUser, TiraUserCreate, TiraUserUpdate
 from app.services.auth_service import auth_service
 
 router = APIRouter()
 
 @router.get("")
-async def get_tira_users(page: int = 1, limit: int = 50):
-    """Get Tira users with pagination"""
-    offset = (page - 1) * limit
-    users = await user_service.get_all_users(offset=offset, limit=limit)
+async def get_tira_users(page: int = Query(1, ge=1), limit: int = Query(50, ge=1), cursor: Optional[int] = None):
+    """Get Tira users with pagination (pass `cursor` from a previous page for keyset paging)"""
+    if cursor is not None:
+        result = await user_service.get_users_after(cursor, limit)
+        users, next_cursor = result["users"], result["next_cursor"]
+    else:
+        users = await user_service.get_all_users(offset=(page - 1) * limit, limit=limit)
+        # Numeric pages are resolved to a keyset seek too (see TiraUserService.get_all_users)
+        next_cursor = users[-1]["id"] if users and len(users) == limit else None
     total = await user_service.get_user_count()
     return {
         "users": users,
         "total": total,
         "page": page,
         "limit": limit,
-        "total_pages": (total + limit - 1) // limit
+        "total_pages": (total + limit - 1) // limit,
+        "next_cursor": next_cursor
     }
 
 @router.get("/{user_id}", response_model=Dict[str, Any])
@@ -62,5 +69,5 @@ async def bulk_upsert_tira_users(users: List[Dict[str, Any]]):
 @router.get("/export/all")
 async def export_all_tira_users():
     """Get all Tira users for CSV export (no pagination)"""
-    users = await user_service.get_all_users(offset=0, limit=999999)
-    return {"users": users}
+    users = await user_service.export_all_users()
+    return json_response({"users": users})
@@ -3,6 +3,8 @@ WebSocket API Routes
 Real-time log streaming endpoint
 """
 
+from datetime import datetime
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from app.utils.websocket_manager import ws_manager
 from app.utils.logger import get_logger
@@ -19,17 +21,14 @@ async def websocket_logs_endpoint(websocket: WebSocket):
     
     Clients connect to: ws://localhost:8000/ws/logs
     """
-    await ws_manager.connect(websocket)
+    # Initial connection message goes out first through the client's writer, so it can't race broadcasts
+    await ws_manager.connect(websocket, greeting={
+        "type": "connection",
+        "message": "Connected to Tira Automation log stream",
+        "timestamp": datetime.now()
+    })
     
     try:
-        # Send initial connection message
-        import json
-        await websocket.send_text(json.dumps({
-            "type": "connection",
-            "message": "Connected to Tira Automation log stream",
-            "timestamp": __import__('datetime').datetime.now().isoformat()
-        }))
-        
         # Keep connection alive and listen for client messages
         while True:
             # Wait for messages from client (keepalive, ping, etc.)
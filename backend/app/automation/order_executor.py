@@ -481,7 +481,7 @@ class OrderExecutor:
                     'products': [p.model_dump(mode='json') for p in config.products],
                     'payment_method': config.payment_method.value,
                     'status': OrderStatus.PENDING.value,
-                    'subtotal': sum(p.price * p.quantity for p in config.products),
+                    'subtotal': config.subtotal,
                     'discount': 0.0,
                     'total': 0.0,
                     'started_at': None,
@@ -491,7 +491,7 @@ class OrderExecutor:
                     'logs': []
                 }
                 
-                await order_service.create_order(order_data)
+                await order_service.create_order(order_data, returning=('id',))
                 self.active_orders[current_order_id] = order_data
                 
                 try:
@@ -752,7 +752,7 @@ class OrderExecutor:
             'status': status.value,
             **kwargs
         }
-        await order_service.update_order(order_id, updates)
+        await order_service.update_order(order_id, updates, returning=('id',))
         
         # Update in-memory cache
         if order_id in self.active_orders:
@@ -826,7 +826,7 @@ class OrderExecutor:
                             
                         if updates:
                             logger.info(f"[TEST] Updating user {user_id} with: {updates}")
-                            await user_service.update_tira_user(user_id, updates)
+                            await user_service.update_tira_user(user_id, updates, returning=('id',))
                             # Update local user object for return
                             user.update(updates)
                 except Exception as e:
@@ -28,8 +28,11 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    DB_POOL_MIN_SIZE: int = 10  # asyncpg pool used for hot reads
+    DB_POOL_MAX_SIZE: int = 50
+    DB_STATEMENT_CACHE_SIZE: int = 1024
+
 
-    
     # Session Management (replaces Chrome profiles)
     TOTAL_SESSIONS: int = 20  # Number of concurrent sessions to support
     SESSION_TIMEOUT: int = 1800000  # 30 minutes in milliseconds
@@ -1,14 +1,22 @@
 
+import asyncio
+from typing import Optional
+
+import asyncpg
+import orjson
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 from app.config import settings
+from app.utils.json_utils import to_json
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,  # Set to True for SQL logging
     poolclass=NullPool, # Use NullPool for now to avoid issues with event loops or use specific pool settings
+    json_serializer=to_json,  # JSONB-typed binds (see data_service._json_text)
+    json_deserializer=orjson.loads,
 )
 
 # Create session factory
@@ -19,6 +27,58 @@ AsyncSessionLocal = sessionmaker(
     autoflush=False
 )
 
+# Shared asyncpg pool for hot single-statement reads (writes/transactions stay on SQLAlchemy)
+pg_pool: Optional[asyncpg.Pool] = None
+_pg_pool_lock = asyncio.Lock()
+
+
+def _encode_json(value) -> str:
+    """JSON text for a bind value; a str is taken as already-serialized JSON and passed through"""
+    return value if isinstance(value, str) else to_json(value)
+
+
+async def _init_connection(conn: asyncpg.Connection):
+    """Encode/decode json and jsonb with orjson so both sides of the driver work with Python objects"""
+    await conn.set_type_codec(
+        'jsonb',
+        # Binary jsonb is a version byte (1) followed by the JSON text
+        encoder=lambda value: b'\x01' + _encode_json(value).encode(),
+        decoder=lambda value: orjson.loads(value[1:]),
+        schema='pg_catalog',
+        format='binary'
+    )
+    await conn.set_type_codec(
+        'json',
+        encoder=_encode_json,
+        decoder=orjson.loads,
+        schema='pg_catalog'
+    )
+
+
+async def get_pg_pool() -> asyncpg.Pool:
+    """Return the shared asyncpg pool, creating it on first use"""
+    global pg_pool
+    if pg_pool is None:
+        async with _pg_pool_lock:
+            if pg_pool is None:
+                pg_pool = await asyncpg.create_pool(
+                    settings.DATABASE_URL.replace("+asyncpg", ""),
+                    min_size=settings.DB_POOL_MIN_SIZE,
+                    max_size=settings.DB_POOL_MAX_SIZE,
+                    statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+                    init=_init_connection
+                )
+    return pg_pool
+
+
+async def close_pg_pool():
+    """Close the shared asyncpg pool if it was created"""
+    global pg_pool
+    if pg_pool is not None:
+        await pg_pool.close()
+        pg_pool = None
+
+
 async def get_db():
     """Dependency for getting database session"""
     async with AsyncSessionLocal() as session:
@@ -20,7 +20,9 @@ import traceback
 from pathlib import Path
 
 from app.config import settings
-from app.utils.logger import setup_logging
+from app.database import get_pg_pool, close_pg_pool
+from app.services.data_service import log_batcher
+from app.utils.logger import setup_logging, start_websocket_logging, stop_websocket_logging
 from app.utils.websocket_manager import ws_manager
 from app.api import addresses, auth, products, orders, automation, tira_users, checkpoints, cards
 from app.services.auth_service import auth_service
@@ -44,16 +46,26 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("[START] Starting Tira Automation Backend")
     
+    # WebSocket log records are dispatched onto this loop, whichever thread logs them
+    start_websocket_logging(asyncio.get_running_loop())
+    
     # Directories should be created manually before running the application
     # Path(settings.DATA_DIR).mkdir(parents=True, exist_ok=True)
     # Path(settings.LOGS_DIR).mkdir(parents=True, exist_ok=True)
     # Path(settings.ORDERS_DIR).mkdir(parents=True, exist_ok=True)
     
+    # Open the shared asyncpg pool up front so the first reads don't pay for it
+    await get_pg_pool()
+    
     logger.info("[OK] Application initialized")
     
     yield
     
     logger.info("[STOP] Shutting down Tira Automation Backend")
+    await log_batcher.close()
+    await close_pg_pool()
+    # Last, so shutdown logs still reach clients while the loop is running
+    stop_websocket_logging()
 
 
 # Initialize FastAPI app
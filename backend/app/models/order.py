@@ -6,6 +6,7 @@ Updated to use session-based ordering instead of Chrome profiles
 from pydantic import BaseModel, Field, HttpUrl, model_validator
 from typing import List, Optional
 from enum import Enum
+from functools import cached_property
 from datetime import datetime
 from uuid import UUID
 
@@ -64,6 +65,11 @@ class OrderConfig(BaseModel):
     headless: bool = Field(default=False, description="Run browsers in headless mode")
     mode: ExecutionMode = Field(default=ExecutionMode.FULL_AUTOMATION, description="Execution mode")
 
+    @cached_property
+    def subtotal(self) -> float:
+        """Sum of price * quantity over the products, computed once per config"""
+        return sum(p.price * p.quantity for p in self.products)
+
 
 class TestLoginConfig(BaseModel):
     """Configuration for test login execution"""
@@ -2,35 +2,186 @@
 import json
 import asyncio
 from pathlib import Path
-from typing import List, Optional, Dict, Any, TypeVar, Generic
-from datetime import datetime
+from typing import List, Optional, Dict, Any, TypeVar, Generic, Sequence, Tuple
+from datetime import datetime, timezone
 import uuid
-from sqlalchemy import text
-from app.database import get_db, AsyncSessionLocal
+import time
+from functools import lru_cache
+import asyncpg
+import orjson
+from sqlalchemy import text, bindparam
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.dialects.postgresql import JSONB
+from app.database import get_db, AsyncSessionLocal, get_pg_pool
 from app.config import settings
 from app.utils.logger import get_logger
-from app.utils.json_utils import to_json
 
 
 logger = get_logger("data_service")
 
+# Static statements, built once at import instead of on every call
+SQL_GET_PRODUCT = text("SELECT * FROM products WHERE id = :id")
+SQL_DELETE_PRODUCT = text("DELETE FROM products WHERE id = :id")
+SQL_DELETE_ADDRESS = text("DELETE FROM addresses WHERE id = :id")
+SQL_GET_DEFAULT_ADDRESS = text("SELECT * FROM addresses WHERE is_default = true")
+SQL_GET_ALL_CARDS = text("SELECT * FROM credit_cards ORDER BY created_at DESC")
+SQL_DELETE_CARD = text("DELETE FROM credit_cards WHERE id = :id")
+SQL_GET_DEFAULT_CARD = text("SELECT * FROM credit_cards WHERE is_default = true")
+SQL_GET_ALL_SESSIONS = text("SELECT * FROM sessions")
+SQL_TOUCH_SESSION = text("UPDATE sessions SET updated_at = NOW() WHERE session_id = :id")
+SQL_UPSERT_COOKIE = text("""
+    INSERT INTO cookies (name, value, domain, path, expires, http_only, secure, same_site, is_active)
+    VALUES (:name, :value, :domain, :path, :expires, :httpOnly, :secure, :sameSite, true)
+    ON CONFLICT (name, domain) WHERE is_active = true
+    DO UPDATE SET value = EXCLUDED.value, updated_at = NOW()
+""")
+SQL_GET_ORDERS_BY_SESSION = text("SELECT * FROM orders WHERE session_id = :session_id")
+SQL_GET_ALL_ORDERS = text("SELECT * FROM orders ORDER BY created_at DESC")
+SQL_DELETE_ORDER = text("DELETE FROM orders WHERE id = :id")
+SQL_DELETE_BATCH = text("DELETE FROM orders WHERE batch_id = :batch_id")
+SQL_GET_BATCHES_WITH_STATS = text("""
+    SELECT 
+        batch_id, 
+        MIN(created_at) as created_at,
+        COUNT(*) as total_orders,
+        COUNT(*) FILTER (WHERE status = 'completed') as successful_orders,
+        COUNT(*) FILTER (WHERE status = 'failed') as failed_orders,
+        COUNT(*) FILTER (WHERE status = 'processing') as processing_orders,
+        COUNT(*) FILTER (WHERE status = 'pending') as pending_orders,
+        SUM(total) as total_amount
+    FROM orders 
+    WHERE batch_id IS NOT NULL 
+    GROUP BY batch_id 
+    ORDER BY MIN(created_at) DESC
+""")
+SQL_CLEAR_HISTORY = text("TRUNCATE logs, orders, sessions RESTART IDENTITY")
+SQL_GET_USERS_AFTER = text("SELECT * FROM tira_users WHERE id > :cursor ORDER BY id ASC LIMIT :limit")
+SQL_GET_USER_ID_AT_OFFSET = text("SELECT id FROM tira_users ORDER BY id ASC LIMIT 1 OFFSET :offset")
+SQL_COUNT_USERS = text("SELECT COUNT(*) FROM tira_users")
+SQL_GET_USER = text("SELECT * FROM tira_users WHERE id = :id")
+SQL_DELETE_USER = text("DELETE FROM tira_users WHERE id = :id")
+
+
+# In-process cache for the default address/card rows: table -> (expires_at, row)
+# Cleared by every write to the table, the TTL covers writes from other processes
+_DEFAULT_CACHE_TTL = 30.0
+_default_cache: Dict[str, tuple] = {}
+# Bumped on invalidation so a read that raced a write doesn't re-cache the stale row
+_default_versions: Dict[str, int] = {}
+
+
+def _get_cached_default(table: str) -> tuple:
+    """Return (hit, row) for the cached default row of `table`"""
+    entry = _default_cache.get(table)
+    if entry and entry[0] > time.monotonic():
+        return True, dict(entry[1]) if entry[1] else None
+    return False, None
+
+
+def _set_cached_default(table: str, row: Optional[Dict[str, Any]], version: int):
+    if _default_versions.get(table, 0) == version:
+        _default_cache[table] = (time.monotonic() + _DEFAULT_CACHE_TTL, row)
+
+
+def _invalidate_default(table: str):
+    _default_versions[table] = _default_versions.get(table, 0) + 1
+    _default_cache.pop(table, None)
+
+
+async def _fetch_one(query: str, *args) -> Optional[Dict[str, Any]]:
+    """Single-row read straight on the shared asyncpg pool, no ORM session"""
+    pool = await get_pg_pool()
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(query, *args)
+    return dict(row) if row else None
+
+
+async def _fetch_all(query: str, *args) -> List[asyncpg.Record]:
+    """
+    Multi-row read on the shared asyncpg pool.
+    Records are returned as-is for JSON-only consumers (see json_utils.json_response).
+    """
+    pool = await get_pg_pool()
+    async with pool.acquire() as conn:
+        return await conn.fetch(query, *args)
+
+
+# JSONB columns across orders/tira_users/logs; bound as JSONB so dicts/lists go straight to the driver
+_JSON_COLUMNS = frozenset({'products', 'address_snapshot', 'logs', 'cookies', 'extra_data'})
+
+
+class _JSONBParam(TypeDecorator):
+    """JSONB bind that accepts already-serialized JSON strings (e.g. from the CSV import) as well as dicts/lists"""
+    impl = JSONB
+    cache_ok = True
+
+    def __init__(self):
+        super().__init__(none_as_null=True)
+
+    def process_bind_param(self, value, dialect):
+        # A str is JSON text, not a JSON string scalar: parse it so it isn't encoded twice
+        return orjson.loads(value) if isinstance(value, str) else value
+
+
+_JSONB = _JSONBParam()
+
+
+def _json_text(query: str, columns) -> TextClause:
+    """text() with the JSON columns among `columns` typed as JSONB (serialized by the engine's orjson serializer)"""
+    return text(query).bindparams(*[bindparam(k, type_=_JSONB) for k in columns if k in _JSON_COLUMNS])
+
+
+@lru_cache(maxsize=256)
+def _cached_insert(table: str, columns: Tuple[str, ...], returning: Tuple[str, ...]) -> TextClause:
+    placeholders = [f":{col}" for col in columns]
+    return _json_text(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})"
+        + (f" RETURNING {', '.join(returning)}" if returning else ""),
+        columns
+    )
+
+
+@lru_cache(maxsize=256)
+def _cached_update(table: str, columns: Tuple[str, ...], returning: Tuple[str, ...]) -> TextClause:
+    set_clauses = [f"{k} = :{k}" for k in columns]
+    return _json_text(
+        f"UPDATE {table} SET {', '.join(set_clauses)} WHERE id = :id"
+        + (f" RETURNING {', '.join(returning)}" if returning else ""),
+        columns
+    )
+
+
+@lru_cache(maxsize=256)
+def _cached_upsert(table: str, columns: Tuple[str, ...], conflict: str) -> TextClause:
+    # Partial unique index on `conflict` (WHERE <conflict> IS NOT NULL) must be repeated for inference
+    placeholders = [f":{col}" for col in columns]
+    set_clauses = [f"{k} = EXCLUDED.{k}" for k in columns if k != conflict] + ["updated_at = NOW()"]
+    return _json_text(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) "
+        f"ON CONFLICT ({conflict}) WHERE {conflict} IS NOT NULL DO UPDATE SET {', '.join(set_clauses)}",
+        columns
+    )
+
+
+def _insert_stmt(table: str, data: Dict[str, Any], returning: Sequence[str] = ('*',)) -> TextClause:
+    """INSERT ... RETURNING <returning> for the keys of `data`, cached per column set (empty `returning` omits the clause)"""
+    return _cached_insert(table, tuple(data), tuple(returning))
+
+
+def _update_stmt(table: str, updates: Dict[str, Any], returning: Sequence[str] = ('*',)) -> TextClause:
+    """UPDATE ... WHERE id = :id RETURNING <returning> for the keys of `updates`, cached per column set (empty `returning` omits the clause)"""
+    return _cached_update(table, tuple(updates), tuple(returning))
+
+
 class ProductDataService:
     """Product-specific data service using PostgreSQL"""
     
-    async def get_all_products(self) -> List[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(text("SELECT * FROM products"))
-            rows = result.mappings().all()
-            return [dict(row) for row in rows]
+    async def get_all_products(self) -> List[asyncpg.Record]:
+        return await _fetch_all("SELECT * FROM products")
     
     async def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT * FROM products WHERE id = :id"), 
-                {"id": product_id}
-            )
-            row = result.mappings().first()
-            return dict(row) if row else None
+        return await _fetch_one("SELECT * FROM products WHERE id = $1", product_id)
     
     async def create_product(self, product: Dict[str, Any]) -> Dict[str, Any]:
         async with AsyncSessionLocal() as session:
@@ -42,16 +193,11 @@ class ProductDataService:
             if 'url' in product and product['url']:
                 product['url'] = str(product['url'])
             
-            # Simple query construction (for now, or use ORM later)
             # Using raw SQL for direct mapping to the provided schema
-            columns = list(product.keys())
-            values = list(product.values())
-            placeholders = [f":{col}" for col in columns]
-            
-            query = f"INSERT INTO products ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) RETURNING *"
+            stmt = _insert_stmt("products", product)
             
             try:
-                result = await session.execute(text(query), product)
+                result = await session.execute(stmt, product)
                 await session.commit()
                 row = result.mappings().first()
                 logger.info(f"[OK] Created product with ID: {product['id']}")
@@ -64,18 +210,23 @@ class ProductDataService:
     async def update_product(self, product_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         async with AsyncSessionLocal() as session:
             if not updates:
-                return await self.get_product(product_id)
+                # No-op update: read the row on this session instead of checking out another
+                result = await session.execute(
+                    SQL_GET_PRODUCT,
+                    {"id": product_id}
+                )
+                row = result.mappings().first()
+                return dict(row) if row else None
             
             # Convert Url objects to strings
             if 'url' in updates and updates['url']:
                 updates['url'] = str(updates['url'])
                 
-            set_clauses = [f"{k} = :{k}" for k in updates.keys()]
-            query = f"UPDATE products SET {', '.join(set_clauses)} WHERE id = :id RETURNING *"
+            stmt = _update_stmt("products", updates)
             updates['id'] = product_id
             
             try:
-                result = await session.execute(text(query), updates)
+                result = await session.execute(stmt, updates)
                 await session.commit()
                 row = result.mappings().first()
                 if row:
@@ -91,7 +242,7 @@ class ProductDataService:
         async with AsyncSessionLocal() as session:
             try:
                 result = await session.execute(
-                    text("DELETE FROM products WHERE id = :id"), 
+                    SQL_DELETE_PRODUCT, 
                     {"id": product_id}
                 )
                 await session.commit()
@@ -105,40 +256,24 @@ class ProductDataService:
 class AddressDataService:
     """Address-specific data service using PostgreSQL"""
     
-    async def get_all_addresses(self) -> List[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(text("SELECT * FROM addresses"))
-            rows = result.mappings().all()
-            return [dict(row) for row in rows]
+    async def get_all_addresses(self) -> List[asyncpg.Record]:
+        return await _fetch_all("SELECT * FROM addresses")
     
     async def get_address(self, address_id: str) -> Optional[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT * FROM addresses WHERE id = :id"), 
-                {"id": address_id}
-            )
-            row = result.mappings().first()
-            return dict(row) if row else None
+        return await _fetch_one("SELECT * FROM addresses WHERE id = $1", address_id)
     
     async def create_address(self, address: Dict[str, Any]) -> Dict[str, Any]:
         async with AsyncSessionLocal() as session:
-            # Handle default address logic
-            if address.get('is_default'):
-                await session.execute(
-                    text("UPDATE addresses SET is_default = false WHERE is_default = true")
-                )
-            
             if 'id' not in address:
                 address['id'] = str(uuid.uuid4())
-                
-            columns = list(address.keys())
-            placeholders = [f":{col}" for col in columns]
-            
-            query = f"INSERT INTO addresses ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) RETURNING *"
-            
+
+            # Clearing the previous default is handled by the clear_addresses_default trigger
+            stmt = _insert_stmt("addresses", address)
+
             try:
-                result = await session.execute(text(query), address)
+                result = await session.execute(stmt, address)
                 await session.commit()
+                _invalidate_default("addresses")
                 row = result.mappings().first()
                 return dict(row)
             except Exception as e:
@@ -148,19 +283,13 @@ class AddressDataService:
     
     async def update_address(self, address_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         async with AsyncSessionLocal() as session:
-            if updates.get('is_default'):
-                await session.execute(
-                    text("UPDATE addresses SET is_default = false WHERE is_default = true AND id != :id"),
-                    {"id": address_id}
-                )
-            
-            set_clauses = [f"{k} = :{k}" for k in updates.keys()]
-            query = f"UPDATE addresses SET {', '.join(set_clauses)} WHERE id = :id RETURNING *"
+            stmt = _update_stmt("addresses", updates)
             updates['id'] = address_id
             
             try:
-                result = await session.execute(text(query), updates)
+                result = await session.execute(stmt, updates)
                 await session.commit()
+                _invalidate_default("addresses")
                 row = result.mappings().first()
                 return dict(row) if row else None
             except Exception as e:
@@ -172,10 +301,11 @@ class AddressDataService:
         async with AsyncSessionLocal() as session:
             try:
                 result = await session.execute(
-                    text("DELETE FROM addresses WHERE id = :id"), 
+                    SQL_DELETE_ADDRESS, 
                     {"id": address_id}
                 )
                 await session.commit()
+                _invalidate_default("addresses")
                 return result.rowcount > 0
             except Exception as e:
                 logger.error(f"Error deleting address: {e}")
@@ -183,10 +313,16 @@ class AddressDataService:
                 return False
     
     async def get_default_address(self) -> Optional[Dict[str, Any]]:
+        hit, cached = _get_cached_default("addresses")
+        if hit:
+            return cached
+        version = _default_versions.get("addresses", 0)
         async with AsyncSessionLocal() as session:
-            result = await session.execute(text("SELECT * FROM addresses WHERE is_default = true"))
+            result = await session.execute(SQL_GET_DEFAULT_ADDRESS)
             row = result.mappings().first()
-            return dict(row) if row else None
+            address = dict(row) if row else None
+        _set_cached_default("addresses", address, version)
+        return dict(address) if address else None
 
 
 class CardDataService:
@@ -194,38 +330,25 @@ class CardDataService:
     
     async def get_all_cards(self) -> List[Dict[str, Any]]:
         async with AsyncSessionLocal() as session:
-            result = await session.execute(text("SELECT * FROM credit_cards ORDER BY created_at DESC"))
+            result = await session.execute(SQL_GET_ALL_CARDS)
             rows = result.mappings().all()
             return [dict(row) for row in rows]
     
     async def get_card(self, card_id: str) -> Optional[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT * FROM credit_cards WHERE id = :id"), 
-                {"id": card_id}
-            )
-            row = result.mappings().first()
-            return dict(row) if row else None
+        return await _fetch_one("SELECT * FROM credit_cards WHERE id = $1", card_id)
     
     async def create_card(self, card: Dict[str, Any]) -> Dict[str, Any]:
         async with AsyncSessionLocal() as session:
-            # Handle default card logic
-            if card.get('is_default'):
-                await session.execute(
-                    text("UPDATE credit_cards SET is_default = false WHERE is_default = true")
-                )
-            
             if 'id' not in card:
                 card['id'] = str(uuid.uuid4())
-                
-            columns = list(card.keys())
-            placeholders = [f":{col}" for col in columns]
-            
-            query = f"INSERT INTO credit_cards ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) RETURNING *"
-            
+
+            # Clearing the previous default is handled by the clear_credit_cards_default trigger
+            stmt = _insert_stmt("credit_cards", card)
+
             try:
-                result = await session.execute(text(query), card)
+                result = await session.execute(stmt, card)
                 await session.commit()
+                _invalidate_default("credit_cards")
                 row = result.mappings().first()
                 logger.info(f"Created credit card: {card.get('card_name')}")
                 return dict(row)
@@ -236,19 +359,13 @@ class CardDataService:
     
     async def update_card(self, card_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         async with AsyncSessionLocal() as session:
-            if updates.get('is_default'):
-                await session.execute(
-                    text("UPDATE credit_cards SET is_default = false WHERE is_default = true AND id != :id"),
-                    {"id": card_id}
-                )
-            
-            set_clauses = [f"{k} = :{k}" for k in updates.keys()]
-            query = f"UPDATE credit_cards SET {', '.join(set_clauses)} WHERE id = :id RETURNING *"
+            stmt = _update_stmt("credit_cards", updates)
             updates['id'] = card_id
             
             try:
-                result = await session.execute(text(query), updates)
+                result = await session.execute(stmt, updates)
                 await session.commit()
+                _invalidate_default("credit_cards")
                 row = result.mappings().first()
                 return dict(row) if row else None
             except Exception as e:
@@ -260,10 +377,11 @@ class CardDataService:
         async with AsyncSessionLocal() as session:
             try:
                 result = await session.execute(
-                    text("DELETE FROM credit_cards WHERE id = :id"), 
+                    SQL_DELETE_CARD, 
                     {"id": card_id}
                 )
                 await session.commit()
+                _invalidate_default("credit_cards")
                 return result.rowcount > 0
             except Exception as e:
                 logger.error(f"Error deleting card: {e}")
@@ -271,10 +389,16 @@ class CardDataService:
                 return False
     
     async def get_default_card(self) -> Optional[Dict[str, Any]]:
+        hit, cached = _get_cached_default("credit_cards")
+        if hit:
+            return cached
+        version = _default_versions.get("credit_cards", 0)
         async with AsyncSessionLocal() as session:
-            result = await session.execute(text("SELECT * FROM credit_cards WHERE is_default = true"))
+            result = await session.execute(SQL_GET_DEFAULT_CARD)
             row = result.mappings().first()
-            return dict(row) if row else None
+            card = dict(row) if row else None
+        _set_cached_default("credit_cards", card, version)
+        return dict(card) if card else None
 
 
 class SessionDataService:
@@ -287,18 +411,13 @@ class SessionDataService:
 
     async def get_all_sessions(self) -> List[Dict[str, Any]]:
         async with AsyncSessionLocal() as session:
-            result = await session.execute(text("SELECT * FROM sessions"))
+            result = await session.execute(SQL_GET_ALL_SESSIONS)
             rows = result.mappings().all()
             return [dict(row) for row in rows]
             
     async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT * FROM sessions WHERE session_id = :id"), # Note: schema uses session_id column, assuming that matches logical id
-                {"id": session_id}
-            )
-            row = result.mappings().first()
-            return dict(row) if row else None
+        # Note: schema uses session_id column, assuming that matches logical id
+        return await _fetch_one("SELECT * FROM sessions WHERE session_id = $1", session_id)
 
     async def update_session_cookies(self, session_id: str, cookies: list):
         # We need to store cookies. Schema has a 'cookies' table and a 'sessions' table.
@@ -316,7 +435,7 @@ class SessionDataService:
         async with AsyncSessionLocal() as session:
             # First update session usage
             await session.execute(
-                text("UPDATE sessions SET updated_at = NOW() WHERE session_id = :id"),
+                SQL_TOUCH_SESSION,
                 {"id": session_id}
             )
             
@@ -341,13 +460,7 @@ class SessionDataService:
                 # Clear existing active cookies for simplicity or merge?
                 # The method receives a list of dicts (cookies).
                 for cookie in cookies:
-                    # Upsert cookie
-                    query = """
-                    INSERT INTO cookies (name, value, domain, path, expires, http_only, secure, same_site, is_active)
-                    VALUES (:name, :value, :domain, :path, :expires, :httpOnly, :secure, :sameSite, true)
-                    ON CONFLICT (name, domain) WHERE is_active = true
-                    DO UPDATE SET value = EXCLUDED.value, updated_at = NOW()
-                    """
+                    # Upsert cookie (SQL_UPSERT_COOKIE)
                     # Key mapping might be needed (camelCase to snake_case)
                     params = {
                         "name": cookie.get("name"),
@@ -359,7 +472,7 @@ class SessionDataService:
                         "secure": cookie.get("secure", False),
                         "sameSite": cookie.get("sameSite", "Lax")
                     }
-                    await session.execute(text(query), params)
+                    await session.execute(SQL_UPSERT_COOKIE, params)
                 
                 await session.commit()
             except Exception as e:
@@ -370,50 +483,54 @@ class SessionDataService:
 class OrderDataService:
     """Order-specific data service using PostgreSQL"""
     
-    async def create_order(self, order: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_order(self, order: Dict[str, Any], returning: Sequence[str] = ('*',)) -> Dict[str, Any]:
+        """Insert an order. Pass returning=('id',) when the caller doesn't need the full row back."""
         async with AsyncSessionLocal() as session:
-            # Handle JSON fields
-            if 'products' in order and not isinstance(order['products'], str):
-                order['products'] = to_json(order['products'])
-            if 'address_snapshot' in order and not isinstance(order['address_snapshot'], str):
-                order['address_snapshot'] = to_json(order['address_snapshot'])
-            if 'logs' in order and not isinstance(order['logs'], str):
-                order['logs'] = to_json(order['logs'])
-            
             if 'id' not in order:
                 order['id'] = str(uuid.uuid4())
                 
-            columns = list(order.keys())
-            placeholders = [f":{col}" for col in columns]
-            
-            query = f"INSERT INTO orders ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) RETURNING *"
+            stmt = _insert_stmt("orders", order, returning)
             
             try:
-                result = await session.execute(text(query), order)
+                result = await session.execute(stmt, order)
                 await session.commit()
                 row = result.mappings().first()
-                # Convert JSON strings back to objects if needed, but dict(row) usually returns dict for JSONB
                 return dict(row)
             except Exception as e:
                 logger.error(f"Error creating order: {e}")
                 await session.rollback()
                 raise
     
-    async def update_order(self, order_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def create_orders(self, orders: List[Dict[str, Any]]) -> List[str]:
+        """
+        Insert many orders in one transaction and return their ids.
+        Ids are generated client-side, so the rows go out as a single executemany with no RETURNING.
+        All orders must share the same keys.
+        """
+        if not orders:
+            return []
+        for order in orders:
+            order.setdefault('id', str(uuid.uuid4()))
+
         async with AsyncSessionLocal() as session:
-            # Handle JSON fields
-            for json_field in ['products', 'address_snapshot', 'logs']:
-                if json_field in updates and not isinstance(updates[json_field], str):
-                    updates[json_field] = to_json(updates[json_field])
+            try:
+                await session.execute(_insert_stmt("orders", orders[0], returning=()), orders)
+                await session.commit()
+                return [order['id'] for order in orders]
+            except Exception as e:
+                logger.error(f"Error creating orders: {e}")
+                await session.rollback()
+                raise
 
-            set_clauses = [f"{k} = :{k}" for k in updates.keys()]
-            query = f"UPDATE orders SET {', '.join(set_clauses)} WHERE id = :id RETURNING *"
+    async def update_order(self, order_id: str, updates: Dict[str, Any], returning: Sequence[str] = ('*',)) -> Optional[Dict[str, Any]]:
+        async with AsyncSessionLocal() as session:
+            stmt = _update_stmt("orders", updates, returning)
             updates['id'] = order_id
             
             try:
-                result = await session.execute(text(query), updates)
+                result = await session.execute(stmt, updates)
                 await session.commit()
-                row = result.mappings().first()
+                row = result.mappings().first() if returning else None
                 return dict(row) if row else None
             except Exception as e:
                 logger.error(f"Error updating order: {e}")
@@ -421,26 +538,20 @@ class OrderDataService:
                 return None
     
     async def get_order(self, order_id: str) -> Optional[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT * FROM orders WHERE id = :id"), 
-                {"id": order_id}
-            )
-            row = result.mappings().first()
-            return dict(row) if row else None
+        return await _fetch_one("SELECT * FROM orders WHERE id = $1", order_id)
     
     async def get_orders_by_session(self, session_id: str) -> List[Dict[str, Any]]:
         async with AsyncSessionLocal() as session:
             result = await session.execute(
-                text("SELECT * FROM orders WHERE session_id = :session_id"),
+                SQL_GET_ORDERS_BY_SESSION,
                 {"session_id": session_id}
             )
             rows = result.mappings().all()
             return [dict(row) for row in rows]
-    
+
     async def get_all_orders(self) -> List[Dict[str, Any]]:
         async with AsyncSessionLocal() as session:
-            result = await session.execute(text("SELECT * FROM orders ORDER BY created_at DESC"))
+            result = await session.execute(SQL_GET_ALL_ORDERS)
             rows = result.mappings().all()
             return [dict(row) for row in rows]
 
@@ -448,14 +559,9 @@ class OrderDataService:
         """Delete an order and its associated logs"""
         async with AsyncSessionLocal() as session:
             try:
-                # Delete logs first (foreign key)
-                await session.execute(
-                    text("DELETE FROM logs WHERE order_id = :order_id"),
-                    {"order_id": order_id}
-                )
-                # Delete order
+                # Logs are removed by ON DELETE CASCADE on logs.order_id
                 result = await session.execute(
-                    text("DELETE FROM orders WHERE id = :id"),
+                    SQL_DELETE_ORDER,
                     {"id": order_id}
                 )
                 await session.commit()
@@ -469,16 +575,9 @@ class OrderDataService:
         """Delete all orders and logs associated with a batch"""
         async with AsyncSessionLocal() as session:
             try:
-                # 1. Delete all logs for all orders in this batch
-                query_logs = """
-                DELETE FROM logs 
-                WHERE order_id IN (SELECT id FROM orders WHERE batch_id = :batch_id)
-                """
-                await session.execute(text(query_logs), {"batch_id": batch_id})
-                
-                # 2. Delete all orders for this batch
+                # Logs are removed by ON DELETE CASCADE on logs.order_id
                 result = await session.execute(
-                    text("DELETE FROM orders WHERE batch_id = :batch_id"),
+                    SQL_DELETE_BATCH,
                     {"batch_id": batch_id}
                 )
                 
@@ -490,55 +589,46 @@ class OrderDataService:
                 await session.rollback()
                 return False
 
-    async def get_all_batches(self) -> List[Dict[str, Any]]:
-        """Get summary of all order batches"""
+    async def get_batches_with_stats(self) -> List[Dict[str, Any]]:
+        """Get summary of all order batches including per-status counts, in one query"""
         async with AsyncSessionLocal() as session:
-            query = """
-                SELECT 
-                    batch_id, 
-                    MIN(created_at) as created_at,
-                    COUNT(*) as total_orders,
-                    COUNT(CASE WHEN status = 'completed' THEN 1 END) as successful_orders,
-                    COUNT(CASE WHEN status = 'failed' THEN 1 END) as failed_orders,
-                    SUM(total) as total_amount
-                FROM orders 
-                WHERE batch_id IS NOT NULL 
-                GROUP BY batch_id 
-                ORDER BY MIN(created_at) DESC
-            """
-            result = await session.execute(text(query))
+            result = await session.execute(SQL_GET_BATCHES_WITH_STATS)
             rows = result.mappings().all()
             return [dict(row) for row in rows]
 
+    async def get_all_batches(self) -> List[Dict[str, Any]]:
+        """Get summary of all order batches"""
+        return await self.get_batches_with_stats()
+
     async def get_batch_stats(self, batch_id: str) -> Dict[str, Any]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT status, COUNT(*) as count FROM orders WHERE batch_id = :batch_id GROUP BY status"),
-                {"batch_id": batch_id}
-            )
-            rows = result.mappings().all()
-            stats = {row['status']: row['count'] for row in rows}
-            
-            total = sum(stats.values())
-            return {
-                "batch_id": batch_id,
-                "total": total,
-                "successful": stats.get('completed', 0),
-                "failed": stats.get('failed', 0),
-                "processing": stats.get('processing', 0),
-                "pending": stats.get('pending', 0)
-            }
+        """Stats for a single batch. For listing batches use get_batches_with_stats instead."""
+        row = await _fetch_one(
+            """
+            SELECT
+                COALESCE(json_object_agg(status, count), '{}'::json) AS stats,
+                COALESCE(SUM(count), 0)::int AS total
+            FROM (
+                SELECT status, COUNT(*) AS count FROM orders WHERE batch_id = $1 GROUP BY status
+            ) s
+            """,
+            batch_id
+        )
+        stats = row['stats']
+        return {
+            "batch_id": batch_id,
+            "total": row['total'],
+            "successful": stats.get('completed', 0),
+            "failed": stats.get('failed', 0),
+            "processing": stats.get('processing', 0),
+            "pending": stats.get('pending', 0)
+        }
 
     async def clear_all_history(self) -> bool:
         """Delete all orders and logs from database"""
         async with AsyncSessionLocal() as session:
             try:
-                # Delete logs first (foreign key)
-                await session.execute(text("DELETE FROM logs"))
-                # Delete orders
-                await session.execute(text("DELETE FROM orders"))
-                # Clear sessions
-                await session.execute(text("DELETE FROM sessions"))
+                # Single TRUNCATE instead of row-by-row DELETEs; still transactional
+                await session.execute(SQL_CLEAR_HISTORY)
                 await session.commit()
                 return True
             except Exception as e:
@@ -550,19 +640,50 @@ class OrderDataService:
 class TiraUserService:
     """Tira user data service using PostgreSQL"""
     
-    async def get_all_users(self, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+    async def get_users_after(self, cursor_id: int, limit: int) -> Dict[str, Any]:
+        """
+        Keyset pagination over tira_users ordered by id.
+        Returns the page plus `next_cursor` (last id in the page, None when exhausted).
+        """
         async with AsyncSessionLocal() as session:
             result = await session.execute(
-                text("SELECT * FROM tira_users ORDER BY id ASC LIMIT :limit OFFSET :offset"),
-                {"limit": limit, "offset": offset}
+                SQL_GET_USERS_AFTER,
+                {"cursor": cursor_id, "limit": limit}
             )
-            rows = result.mappings().all()
-            return [dict(row) for row in rows]
+            users = [dict(row) for row in result.mappings().all()]
+            next_cursor = users[-1]['id'] if users and len(users) == limit else None
+            return {"users": users, "next_cursor": next_cursor}
+
+    async def _cursor_for_offset(self, offset: int) -> Optional[int]:
+        """
+        Resolve a numeric offset to a keyset cursor (id of the row just before it).
+        Only walks the primary key index, never the full rows.
+        Returns None when the offset is past the end of the table.
+        """
+        if offset <= 0:
+            return 0
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                SQL_GET_USER_ID_AT_OFFSET,
+                {"offset": offset - 1}
+            )
+            return result.scalar()
+
+    async def get_all_users(self, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        cursor_id = await self._cursor_for_offset(offset)
+        if cursor_id is None:
+            return []
+        page = await self.get_users_after(cursor_id, limit)
+        return page["users"]
+
+    async def export_all_users(self) -> List[asyncpg.Record]:
+        """All Tira users as raw records, for JSON export"""
+        return await _fetch_all("SELECT * FROM tira_users ORDER BY id ASC")
 
     async def get_user_count(self) -> int:
         """Get total count of Tira users"""
         async with AsyncSessionLocal() as session:
-            result = await session.execute(text("SELECT COUNT(*) FROM tira_users"))
+            result = await session.execute(SQL_COUNT_USERS)
             return result.scalar() or 0
 
     async def get_users_by_range(self, start_index: int, end_index: int) -> List[Dict[str, Any]]:
@@ -572,44 +693,23 @@ class TiraUserService:
         """
         if start_index < 1:
             start_index = 1
-        
-        offset = start_index - 1
+
         limit = end_index - start_index + 1
-        
+
         if limit <= 0:
             return []
 
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT * FROM tira_users ORDER BY id ASC LIMIT :limit OFFSET :offset"),
-                {"limit": limit, "offset": offset}
-            )
-            rows = result.mappings().all()
-            return [dict(row) for row in rows]
+        return await self.get_all_users(offset=start_index - 1, limit=limit)
     
     async def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT * FROM tira_users WHERE id = :id"), 
-                {"id": user_id}
-            )
-            row = result.mappings().first()
-            return dict(row) if row else None
+        return await _fetch_one("SELECT * FROM tira_users WHERE id = $1", user_id)
 
-    async def create_tira_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_tira_user(self, user_data: Dict[str, Any], returning: Sequence[str] = ('*',)) -> Dict[str, Any]:
         async with AsyncSessionLocal() as session:
-            if 'cookies' in user_data and not isinstance(user_data['cookies'], str):
-                user_data['cookies'] = to_json(user_data['cookies'])
-            if 'extra_data' in user_data and not isinstance(user_data['extra_data'], str):
-                user_data['extra_data'] = to_json(user_data['extra_data'])
-                
-            columns = list(user_data.keys())
-            placeholders = [f":{col}" for col in columns]
-            
-            query = f"INSERT INTO tira_users ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) RETURNING *"
+            stmt = _insert_stmt("tira_users", user_data, returning)
             
             try:
-                result = await session.execute(text(query), user_data)
+                result = await session.execute(stmt, user_data)
                 await session.commit()
                 row = result.mappings().first()
                 return dict(row)
@@ -618,35 +718,38 @@ class TiraUserService:
                 await session.rollback()
                 raise
 
-    async def update_tira_user(self, user_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def update_tira_user(self, user_id: int, updates: Dict[str, Any], returning: Sequence[str] = ('*',)) -> Optional[Dict[str, Any]]:
         async with AsyncSessionLocal() as session:
-            # Handle JSON fields
-            for json_field in ['cookies', 'extra_data']:
-                if json_field in updates and not isinstance(updates[json_field], str):
-                    updates[json_field] = to_json(updates[json_field])
-
-            if not updates:
-                return await self.get_user(user_id)
-
-            set_clauses = [f"{k} = :{k}" for k in updates.keys()]
-            query = f"UPDATE tira_users SET {', '.join(set_clauses)} WHERE id = :id RETURNING *"
-            updates['id'] = user_id
-            
             try:
-                result = await session.execute(text(query), updates)
+                row = await self.update_tira_user_in(session, user_id, updates, returning)
                 await session.commit()
-                row = result.mappings().first()
-                return dict(row) if row else None
+                return row
             except Exception as e:
                 logger.error(f"Error updating tira user: {e}")
                 await session.rollback()
                 return None
 
+    async def update_tira_user_in(self, session, user_id: int, updates: Dict[str, Any], returning: Sequence[str] = ('*',)) -> Optional[Dict[str, Any]]:
+        """update_tira_user on the caller's session; the caller owns commit/rollback"""
+        if not updates:
+            result = await session.execute(
+                SQL_GET_USER,
+                {"id": user_id}
+            )
+            row = result.mappings().first()
+            return dict(row) if row else None
+
+        stmt = _update_stmt("tira_users", updates, returning)
+        updates['id'] = user_id
+        result = await session.execute(stmt, updates)
+        row = result.mappings().first() if returning else None
+        return dict(row) if row else None
+
     async def delete_tira_user(self, user_id: int) -> bool:
         async with AsyncSessionLocal() as session:
             try:
                 result = await session.execute(
-                    text("DELETE FROM tira_users WHERE id = :id"), 
+                    SQL_DELETE_USER, 
                     {"id": user_id}
                 )
                 await session.commit()
@@ -662,68 +765,58 @@ class TiraUserService:
         error_count = 0
         errors = []
 
-        async with AsyncSessionLocal() as session:
-            for user_data in users_list:
+        # Group rows by conflict key and column set: each group is one upsert statement run with executemany
+        valid_columns = ['name', 'email', 'phone', 'points', 'cookies', 'extra_data', 'is_active']
+        groups: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for user_data in users_list:
+            cleaned_data = {k: v for k, v in user_data.items() if k in valid_columns}
+            if cleaned_data.get('email'):
+                conflict = 'email'
+            elif cleaned_data.get('phone'):
+                conflict = 'phone'
+            else:
+                error_count += 1
+                errors.append(f"Error processing user {user_data.get('email', user_data.get('phone', 'unknown'))}: Email or Phone is required for each user")
+                continue
+            # Blank keys would collide in the partial unique indexes; leave them out so the insert stores NULL
+            # and the update keeps the existing value (a phone-keyed row must not wipe a stored email)
+            for key in ('email', 'phone'):
+                if key in cleaned_data and not cleaned_data[key]:
+                    del cleaned_data[key]
+            groups.setdefault((conflict, tuple(cleaned_data)), []).append(cleaned_data)
+
+        # One session and one transaction for the whole import, committed when the block exits
+        async with AsyncSessionLocal() as session, session.begin():
+            for (conflict, columns), rows in groups.items():
+                stmt = _cached_upsert("tira_users", columns, conflict)
                 try:
-                    # Prepare JSON fields
-                    if 'cookies' in user_data and not isinstance(user_data['cookies'], str):
-                        user_data['cookies'] = to_json(user_data['cookies'])
-                    if 'extra_data' in user_data and not isinstance(user_data['extra_data'], str):
-                        user_data['extra_data'] = to_json(user_data['extra_data'])
-                    
-                    # Clean up data to only include schema columns
-                    valid_columns = ['name', 'email', 'phone', 'points', 'cookies', 'extra_data', 'is_active']
-                    cleaned_data = {k: v for k, v in user_data.items() if k in valid_columns}
-                    
-                    if not cleaned_data.get('email') and not cleaned_data.get('phone'):
-                        raise ValueError("Email or Phone is required for each user")
-
-                    # Upsert logic using ON CONFLICT on email (if exists) or manual check
-                    # Since we don't have a unique constraint on email/phone yet in schema (based on init_db output), 
-                    # let's do a manual check or use ON CONFLICT if we add it.
-                    # Looking at init_db: CREATE INDEX IF NOT EXISTS idx_tira_users_email ON tira_users(email);
-                    # It's an index, not a UNIQUE constraint.
-                    
-                    # For safety, let's check by email first
-                    existing = None
-                    if cleaned_data.get('email'):
-                        res = await session.execute(text("SELECT id FROM tira_users WHERE email = :email"), {"email": cleaned_data['email']})
-                        existing = res.mappings().first()
-                    elif cleaned_data.get('phone'):
-                        res = await session.execute(text("SELECT id FROM tira_users WHERE phone = :phone"), {"phone": cleaned_data['phone']})
-                        existing = res.mappings().first()
-
-                    if existing:
-                        # Update
-                        set_clauses = [f"{k} = :{k}" for k in cleaned_data.keys()]
-                        query = f"UPDATE tira_users SET {', '.join(set_clauses)}, updated_at = NOW() WHERE id = :id"
-                        cleaned_data['id'] = existing['id']
-                        await session.execute(text(query), cleaned_data)
-                    else:
-                        # Insert
-                        cols = list(cleaned_data.keys())
-                        placeholders = [f":{col}" for col in cols]
-                        query = f"INSERT INTO tira_users ({', '.join(cols)}) VALUES ({', '.join(placeholders)})"
-                        await session.execute(text(query), cleaned_data)
-                    
-                    success_count += 1
-                except Exception as e:
-                    error_count += 1
-                    errors.append(f"Error processing user {user_data.get('email', user_data.get('phone', 'unknown'))}: {str(e)}")
-            
-            await session.commit()
-            return {
-                "success_count": success_count,
-                "error_count": error_count,
-                "errors": errors
-            }
+                    # Savepoint so a failing group doesn't abort the others
+                    async with session.begin_nested():
+                        await session.execute(stmt, rows)
+                    success_count += len(rows)
+                except Exception:
+                    # Retry the group row by row so the good rows are kept and each error names its user
+                    for row in rows:
+                        try:
+                            async with session.begin_nested():
+                                await session.execute(stmt, row)
+                            success_count += 1
+                        except Exception as e:
+                            error_count += 1
+                            errors.append(f"Error processing user {row[conflict]}: {str(e)}")
+
+        return {
+            "success_count": success_count,
+            "error_count": error_count,
+            "errors": errors
+        }
 
     async def update_user_cookies(self, user_id: int, cookies: list):
-        await self.update_tira_user(user_id, {"cookies": cookies})
+        await self.update_tira_user(user_id, {"cookies": cookies}, returning=('id',))
 
     async def update_user_points(self, user_id: int, points: str):
         """Update Tira points for a specific user"""
-        await self.update_tira_user(user_id, {"points": points})
+        await self.update_tira_user(user_id, {"points": points}, returning=('id',))
 
 
 class LogDataService:
@@ -734,17 +827,10 @@ class LogDataService:
             if 'id' not in log_entry:
                 log_entry['id'] = str(uuid.uuid4())
                 
-            # Handle extra_data if present
-            if 'extra_data' in log_entry and log_entry['extra_data'] and not isinstance(log_entry['extra_data'], str):
-                log_entry['extra_data'] = to_json(log_entry['extra_data'])
-                
-            columns = list(log_entry.keys())
-            placeholders = [f":{col}" for col in columns]
-            
-            query = f"INSERT INTO logs ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) RETURNING *"
+            stmt = _insert_stmt("logs", log_entry)
             
             try:
-                result = await session.execute(text(query), log_entry)
+                result = await session.execute(stmt, log_entry)
                 await session.commit()
                 row = result.mappings().first()
                 return dict(row)
@@ -753,36 +839,123 @@ class LogDataService:
                 await session.rollback()
                 raise
 
-    async def get_logs_by_order(self, order_id: str) -> List[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT * FROM logs WHERE order_id = :order_id ORDER BY created_at ASC"),
-                {"order_id": order_id}
-            )
-            rows = result.mappings().all()
-            return [dict(row) for row in rows]
+    async def get_logs_by_order(self, order_id: str) -> List[asyncpg.Record]:
+        # Records go straight to the JSON encoder, no per-row dict copy
+        return await _fetch_all("SELECT * FROM logs WHERE order_id = $1 ORDER BY created_at ASC", order_id)
+
+
+class LogBatcher:
+    """
+    Buffers log rows in-process and writes them in batches on the shared pool:
+    binary COPY for large batches, executemany for small ones.
+    Rows are fire-and-forget, nothing is returned to the caller.
+    """
+
+    COLUMNS = ('id', 'level', 'logger_name', 'message', 'session_id', 'order_id', 'extra_data', 'stack_trace', 'created_at')
+    INSERT_SQL = f"INSERT INTO logs ({', '.join(COLUMNS)}) VALUES ({', '.join(f'${i}' for i in range(1, len(COLUMNS) + 1))})"
+    COPY_THRESHOLD = 10  # below this, a plain executemany is cheaper than setting up COPY
+    _STOP = object()  # queued by close() to end the writer after its current batch
+
+    def __init__(self, max_batch: int = 500, max_delay: float = 0.2):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, log_entry: Dict[str, Any]):
+        """Queue a log row; must be called from the event loop thread"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        # id and created_at are set here so rows keep their order and identity regardless of flush timing
+        self._queue.put_nowait((
+            log_entry.get('id') or str(uuid.uuid4()),
+            log_entry['level'],
+            log_entry['logger_name'],
+            log_entry['message'],
+            log_entry.get('session_id'),
+            log_entry.get('order_id'),
+            log_entry.get('extra_data'),
+            log_entry.get('stack_trace'),
+            log_entry.get('created_at') or datetime.now(timezone.utc),
+        ))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is self._STOP:
+                    # Still write what was collected; close() drains whatever is left after us
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+
+    async def _write(self, batch: List[tuple]):
+        try:
+            pool = await get_pg_pool()
+            async with pool.acquire() as conn:
+                try:
+                    if len(batch) < self.COPY_THRESHOLD:
+                        await conn.executemany(self.INSERT_SQL, batch)
+                    else:
+                        await conn.copy_records_to_table('logs', records=batch, columns=self.COLUMNS)
+                    return
+                except Exception as e:
+                    if len(batch) == 1:
+                        raise
+                    # One bad row (e.g. an order_id that was deleted meanwhile) fails the whole batch;
+                    # retry row by row so the valid ones still land
+                    logger.warning(f"Batch write of {len(batch)} log entries failed ({e}), retrying row by row")
+                for row in batch:
+                    try:
+                        await conn.execute(self.INSERT_SQL, *row)
+                    except Exception as e:
+                        logger.error(f"Error writing log entry {row[0]}: {e}")
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} log entries: {e}")
+
+    async def close(self):
+        """Stop the background writer and flush whatever is still queued"""
+        if self._task is not None:
+            if not self._task.done():
+                # Let the writer finish its in-flight batch instead of cancelling it mid-way
+                self._queue.put_nowait(self._STOP)
+                await self._task
+            self._task = None
+        if self._queue is not None:
+            batch = []
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not self._STOP:
+                    batch.append(item)
+            for i in range(0, len(batch), self.max_batch):
+                await self._write(batch[i:i + self.max_batch])
 
 
 class AdminDataService:
     """Admin data service using PostgreSQL"""
     
     async def get_admin_by_email_or_username(self, identifier: str) -> Optional[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT * FROM admins WHERE email = :id OR username = :id"),
-                {"id": identifier}
-            )
-            row = result.mappings().first()
-            return dict(row) if row else None
+        # Runs on every authenticated request; the pool's statement cache keeps it prepared per connection
+        return await _fetch_one("SELECT * FROM admins WHERE email = $1 OR username = $1", identifier)
             
     async def get_admin_by_id(self, admin_id: str) -> Optional[Dict[str, Any]]:
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                text("SELECT * FROM admins WHERE id = :id"),
-                {"id": admin_id}
-            )
-            row = result.mappings().first()
-            return dict(row) if row else None
+        return await _fetch_one("SELECT * FROM admins WHERE id = $1", admin_id)
 
 
 # Service instances
@@ -793,4 +966,5 @@ session_service = SessionDataService()
 order_service = OrderDataService()
 user_service = TiraUserService()
 log_service = LogDataService()
+log_batcher = LogBatcher()
 admin_service = AdminDataService()
@@ -6,7 +6,6 @@ Handles orchestration of order execution and status updates
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import asyncio
-import json
 
 from app.models.order import Order, OrderStatus, OrderProduct, OrderConfig
 from app.services.data_service import order_service as order_db, session_service, product_service
@@ -21,49 +20,55 @@ class OrderService:
     
     async def create_bulk_orders(self, config: OrderConfig) -> List[str]:
         """Create initial order records from configuration"""
-        order_ids = []
+        orders = []
         
         # Get address for the orders
         from app.services.data_service import address_service
         address = await address_service.get_address(config.address_id)
         if not address:
             raise ValueError(f"Address with ID {config.address_id} not found")
+        
+        # Same for every order in the batch, so computed once
+        # Calculate totals (simple version)
+        subtotal = config.subtotal
+        # In a real app, discount logic would go here
+        total = subtotal
+        products = [p.model_dump() for p in config.products]
+        now = datetime.now()
+        initial_log = f"[{now.isoformat()}] Order created and pending"
             
         for i in range(config.order_count):
             # content.profile_ids is gone. We assign sessions.
             # Simple round-robin assignment of sessions
             session_idx = (i % settings.TOTAL_SESSIONS) + 1
             session_id = f"session_{session_idx}"
-                
-            # Calculate totals (simple version)
-            subtotal = sum(p.price * p.quantity for p in config.products)
-            # In a real app, discount logic would go here
-            total = subtotal
             
-            order_data = {
+            orders.append({
                 "session_id": session_id,
                 "order_number": i + 1,
-                "products": [p.model_dump() for p in config.products],
-                "address": address,
+                "products": products,
+                "address_id": config.address_id,
+                "address_snapshot": address,
                 "payment_method": config.payment_method,
                 "status": OrderStatus.PENDING,
                 "subtotal": subtotal,
                 "discount": 0.0,
                 "total": total,
-                "created_at": datetime.now().isoformat(),
-                "logs": [f"[{datetime.now().isoformat()}] Order created and pending"]
-            }
-            
-            new_order = await order_db.create_order(order_data)
-            order_ids.append(new_order["id"])
-            
-            # Notify via WebSocket
-            await ws_manager.broadcast(json.dumps({
+                "created_at": now,
+                "logs": [initial_log]
+            })
+        
+        # One batched insert for all orders instead of one round trip each
+        order_ids = await order_db.create_orders(orders)
+        
+        # Notify via WebSocket (coalesced into batch frames by the manager)
+        for order in orders:
+            ws_manager.enqueue({
                 "type": "order_update",
-                "order_id": new_order["id"],
+                "order_id": order["id"],
                 "status": OrderStatus.PENDING,
-                "message": f"Order #{i+1} created for {session_id}"
-            }))
+                "message": f"Order #{order['order_number']} created for {order['session_id']}"
+            })
             
         return order_ids
 
@@ -81,15 +86,15 @@ class OrderService:
         if status == OrderStatus.COMPLETED:
             updates["completed_at"] = datetime.now()
         
-        await order_db.update_order(order_id, updates)
+        await order_db.update_order(order_id, updates, returning=('id',))
         
         # Broadcast update
-        await ws_manager.broadcast(json.dumps({
+        ws_manager.enqueue({
             "type": "order_update",
             "order_id": order_id,
             "status": status,
             "message": message or f"Order status updated to {status}"
-        }))
+        })
 
 # Singleton instance
 order_logic_service = OrderService()
@@ -11,32 +11,42 @@ from app.utils.logger import get_logger
 
 logger = get_logger("validation_service")
 
+REQUIRED_ADDRESS_FIELDS = ("name", "phone", "pincode", "address_line", "city", "state")
+
 class ValidationService:
     """Service for validating various entities"""
     
     @staticmethod
     def validate_order_config(config: OrderConfig) -> List[str]:
         """Enhanced validation for order configuration"""
+        # Nothing else can be checked without products
+        if not config.products:
+            return ["Order must contain at least one product"]
+        
         errors = []
         
         # Basic Pydantic validation is already done by FastAPI, 
         # but we can add business rule validations here
         
-        if config.max_cart_value and sum(p.price * p.quantity for p in config.products) > config.max_cart_value:
+        if config.max_cart_value and config.subtotal > config.max_cart_value:
             errors.append(f"Total order value exceeds max_cart_value ({config.max_cart_value})")
             
-        # Check if all products have valid URLs
-        for product in config.products:
-            if not product.product_url.startswith("https://"):
-                errors.append(f"Invalid product URL: {product.product_url}")
+        # Check if all products have valid URLs (HttpUrl is already parsed, so compare the scheme directly)
+        errors.extend(
+            f"Invalid product URL: {product.product_url}"
+            for product in config.products
+            if product.product_url.scheme != "https"
+        )
                 
         return errors
 
     @staticmethod
     def validate_address(address: Dict[str, Any]) -> List[str]:
         """Validate an address dictionary"""
-        required_fields = ["name", "phone", "pincode", "address_line", "city", "state"]
-        return [f"Missing field: {field}" for field in required_fields if not address.get(field)]
+        # Fast path: a complete address allocates nothing beyond the empty result
+        if all(address.get(field) for field in REQUIRED_ADDRESS_FIELDS):
+            return []
+        return [f"Missing field: {field}" for field in REQUIRED_ADDRESS_FIELDS if not address.get(field)]
 
 # Singleton instance
 validation_service = ValidationService()
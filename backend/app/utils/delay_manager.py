@@ -3,6 +3,7 @@ Delay manager for human-like automation behavior
 """
 
 import asyncio
+import logging
 import random
 from app.config import settings
 from app.utils.logger import get_logger
@@ -22,21 +23,23 @@ class DelayManager:
             "between_products": settings.DELAY_BETWEEN_PRODUCTS,
             "before_checkout": settings.DELAY_BEFORE_CHECKOUT
         }
+        # (min, max) sleep per delay type: base +/- 20%, never below 0.1s
+        self._bounds = {k: self._bounds_for(v) for k, v in self.delays.items()}
+        self._default_bounds = self._bounds_for(1.0)
+    
+    @staticmethod
+    def _bounds_for(base_delay: float) -> tuple:
+        return max(0.1, base_delay * 0.8), max(0.1, base_delay * 1.2)
     
     async def random_delay(self, delay_type: str = "click"):
         """
         Sleep for a random amount of time based on delay type
         """
-        base_delay = self.delays.get(delay_type, 1.0)
-        
-        # Add some randomness (+/- 20%)
-        variation = base_delay * 0.2
-        actual_delay = base_delay + random.uniform(-variation, variation)
-        
-        # Ensure it's not negative
-        actual_delay = max(0.1, actual_delay)
+        low, high = self._bounds.get(delay_type, self._default_bounds)
+        actual_delay = random.uniform(low, high)
         
-        logger.debug(f"[WAIT] Sleeping for {actual_delay:.2f}s ({delay_type})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[WAIT] Sleeping for {actual_delay:.2f}s ({delay_type})")
         await asyncio.sleep(actual_delay)
     
     async def wait(self, seconds: float):
@@ -1,17 +1,24 @@
-from datetime import datetime, date
-from uuid import UUID
-import json
+from decimal import Decimal
 
-class AlchemyEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        if isinstance(obj, UUID):
-            return str(obj)
-        if hasattr(obj, '__str__') and ('Url' in type(obj).__name__ or 'URL' in type(obj).__name__):
-            return str(obj)
-        return super(AlchemyEncoder, self).default(obj)
+import asyncpg
+import orjson
+from fastapi import Response
+
+def _orjson_default(obj):
+    """Fallback for types orjson can't serialize natively (datetime/date/UUID are handled in C)"""
+    if isinstance(obj, asyncpg.Record):
+        return dict(obj)
+    if isinstance(obj, Decimal):
+        # Same output as FastAPI's encoder: whole numbers as int, otherwise float
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if 'Url' in type(obj).__name__ or 'URL' in type(obj).__name__:
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 def to_json(obj):
     """Convert object to JSON string handling UUIDs and datetimes"""
-    return json.dumps(obj, cls=AlchemyEncoder)
+    return orjson.dumps(obj, default=_orjson_default).decode()
+
+def json_response(content) -> Response:
+    """JSON response encoded with orjson, bypassing FastAPI's pydantic serialization (accepts asyncpg Records)"""
+    return Response(content=orjson.dumps(content, default=_orjson_default), media_type="application/json")
@@ -3,7 +3,9 @@ Centralized logging configuration
 """
 
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
@@ -17,6 +19,19 @@ order_context = contextvars.ContextVar("order_id", default=None)
 step_context = contextvars.ContextVar("step", default=None)
 
 
+class LogContextFilter(logging.Filter):
+    """Attach session/order/step from the context vars to records that don't already carry them via extra="""
+    
+    def filter(self, record):
+        if getattr(record, "session_id", None) is None:
+            record.session_id = session_context.get()
+        if getattr(record, "order_id", None) is None:
+            record.order_id = order_context.get()
+        if getattr(record, "step", None) is None:
+            record.step = step_context.get()
+        return True
+
+
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors for console output"""
     
@@ -29,57 +44,103 @@ class ColoredFormatter(logging.Formatter):
     }
     RESET = '\033[0m'
     
-    def format(self, record):
-        # Format the record using the base class first
-        msg = super().format(record)
-        
-        # Add color only to the final string, without touching the record object
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Colored level names built once instead of searched-and-replaced per record
+        self._colored = {level: f"{color}{level}{self.RESET}" for level, color in self.COLORS.items()}
+    
+    def formatMessage(self, record):
+        # Swap in the colored level name only while the message is rendered, the record is restored for other handlers
         levelname = record.levelname
-        if levelname in self.COLORS:
-            color = self.COLORS[levelname]
-            # Replace the first occurrence of levelname with colored version
-            return msg.replace(levelname, f"{color}{levelname}{self.RESET}", 1)
-        
-        return msg
+        colored = self._colored.get(levelname)
+        if colored is None:
+            return super().formatMessage(record)
+        record.levelname = colored
+        try:
+            return super().formatMessage(record)
+        finally:
+            record.levelname = levelname
+
+
+_ws_manager = None  # resolved on first use
+_ws_handler = None  # installed by setup_logging
+_ws_listener = None
+
+
+def _get_ws_manager():
+    """Local import to avoid circular dependency, done once"""
+    global _ws_manager
+    if _ws_manager is None:
+        from app.utils.websocket_manager import ws_manager
+        _ws_manager = ws_manager
+    return _ws_manager
+
+
+class WebSocketGate(logging.Filter):
+    """Caller-side checks deciding whether a record is streamed at all; cheapest first"""
+    
+    # Loggers whose output the dashboard shows (automation/order flow); API, DB, auth and websocket
+    # internals stay in the console, which also keeps websocket logs from recursing. startswith takes the whole tuple
+    STREAM_PREFIXES = (
+        "tira_automation.automation",
+        "tira_automation.order",
+        "tira_automation.checkpoint_executor",
+        "tira_automation.browser_manager",
+        "tira_automation.session",
+    )
+    
+    def filter(self, record):
+        if not record.name.startswith(self.STREAM_PREFIXES):
+            return False
+        # Avoid double-broadcasting if already handled by AutomationLogger
+        if getattr(record, "_ui_handled", False):
+            return False
+        # Listener not running or nobody listening: the record never reaches the queue
+        if _ws_handler is None or _ws_handler.loop is None:
+            return False
+        return bool(_get_ws_manager().active_connections)
+
+
+class WebSocketQueueHandler(QueueHandler):
+    """Caller-side half of the WebSocket handler: the logging call only pays for the gate and a queue put"""
+    
+    def prepare(self, record):
+        # Same process, no pickling: skip QueueHandler's eager format so it runs on the listener thread
+        return record
 
 
 class WebSocketHandler(logging.Handler):
-    """Custom logging handler to broadcast logs via WebSocket"""
+    """Custom logging handler to broadcast logs via WebSocket; runs on the log listener thread (see setup_logging)"""
+    
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None  # app loop, bound by start_websocket_logging
     
     def emit(self, record):
         try:
-            # Get the running loop
-            loop = asyncio.get_running_loop()
-            
-            # Avoid broadcasting websocket-related logs to prevent recursion
-            if record.name.startswith("tira_automation.websocket"):
+            # Records logged before the loop is bound have nowhere to go
+            loop = self.loop
+            if loop is None or loop.is_closed():
                 return
-                
-            # Avoid double-broadcasting if already handled by AutomationLogger
-            if getattr(record, "_ui_handled", False):
-                return
-            
-            # Local import to avoid circular dependency
-            from app.utils.websocket_manager import ws_manager
             
             # Use the record's formatting if available, otherwise just message
             msg = self.format(record)
             
-            # Check for session_id or order_id in context or extra
-            session_id = getattr(record, "session_id", None) or session_context.get()
-            order_id = getattr(record, "order_id", None) or order_context.get()
-            step = getattr(record, "step", None) or step_context.get()
+            # Context or extra, attached on the caller's side by LogContextFilter
+            session_id = record.session_id
+            order_id = record.order_id
             
-            # Broadcast via WebSocket (fire and forget task)
-            loop.create_task(ws_manager.send_log(
-                level=record.levelname,
-                message=msg,
-                session_id=str(session_id) if session_id else None,
-                order_id=str(order_id) if order_id else None,
-                step=step
-            ))
-        except (RuntimeError, Exception):
-            # No running loop or other issue, just skip
+            # queue_log touches loop-owned state, so always hop onto the loop (safe from any thread)
+            loop.call_soon_threadsafe(
+                _get_ws_manager().queue_log,
+                record.levelname,
+                msg,
+                str(session_id) if session_id else None,
+                str(order_id) if order_id else None,
+                record.step
+            )
+        except Exception:
+            # Closed loop or other issue, just skip
             pass
 
 
@@ -107,17 +168,43 @@ def setup_logging() -> logging.Logger:
     )
     console_handler.setFormatter(console_formatter)
     
-    # WebSocket handler for real-time UI updates
-    ws_handler = WebSocketHandler()
-    ws_handler.setLevel(logging.INFO)
+    # WebSocket handler for real-time UI updates, run on a listener thread: formatting and the
+    # cross-thread dispatch stay off the logging call. Gate and context vars are caller-side only
+    global _ws_handler, _ws_listener
+    ws_handler = _ws_handler = WebSocketHandler()
     ws_handler.setFormatter(logging.Formatter('%(message)s'))
+    log_queue = queue.SimpleQueue()
+    ws_queue_handler = WebSocketQueueHandler(log_queue)
+    ws_queue_handler.setLevel(logging.INFO)
+    ws_queue_handler.addFilter(WebSocketGate())
+    ws_queue_handler.addFilter(LogContextFilter())
+    # Started/stopped with the app (start_websocket_logging); until then nothing passes the gate
+    _ws_listener = QueueListener(log_queue, ws_handler)
     
     # Add handlers
     logger.addHandler(console_handler)
-    logger.addHandler(ws_handler)
+    logger.addHandler(ws_queue_handler)
     
     return logger
 
+def start_websocket_logging(loop: asyncio.AbstractEventLoop):
+    """
+    Bind the app's event loop and start the WebSocket log listener thread; called from the app lifespan,
+    so records logged from threads running their own loop can't claim the dispatch
+    """
+    if _ws_handler is None or _ws_listener is None:
+        return
+    _ws_handler.loop = loop
+    _ws_listener.start()
+
+
+def stop_websocket_logging():
+    """Flush queued WebSocket log records onto the still-running loop, then stop the listener and unbind"""
+    if _ws_handler is None or _ws_listener is None or _ws_handler.loop is None:
+        return
+    _ws_listener.stop()
+    _ws_handler.loop = None
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance with the given name
@@ -131,6 +218,16 @@ class AutomationLogger:
     Broadcasts logs to WebSockets and saves them to the database.
     """
     
+    # Logger method names for the usual level strings, so log_step skips level.lower()
+    _LEVEL_METHODS = {
+        "DEBUG": "debug",
+        "INFO": "info",
+        "WARNING": "warning",
+        "WARN": "warning",
+        "ERROR": "error",
+        "CRITICAL": "critical",
+    }
+    
     def __init__(self, session_id: str, order_id: Optional[str] = None):
         self.session_id = session_id
         self.order_id = order_id
@@ -148,26 +245,26 @@ class AutomationLogger:
         
         # Local imports inside method to avoid circular dependencies
         try:
-            from app.services.data_service import log_service
+            from app.services.data_service import log_batcher
             
-            # Save to Database if loop is available
+            # Queue for the batched DB writer if loop is available
             if self._loop and self._loop.is_running():
-                self._loop.create_task(log_service.create_log({
+                log_batcher.enqueue({
                     "level": level,
                     "logger_name": "automation",
                     "message": message,
                     "session_id": str(self.session_id) if self.session_id else None,
                     "order_id": str(self.order_id) if self.order_id else None,
                     "extra_data": {"step": step, **(metadata or {})}
-                }))
+                })
         except Exception as e:
             self.logger.debug(f"Failed to save log to DB: {e}")
 
     def __enter__(self):
         # Set context variables
         self._tokens = [
-            session_context.set(self.session_id),
-            order_context.set(self.order_id)
+            (session_context, session_context.set(self.session_id)),
+            (order_context, order_context.set(self.order_id))
         ]
         
         self.start_time = datetime.now()
@@ -194,11 +291,9 @@ class AutomationLogger:
             self._broadcast_and_save("ERROR", message, step="ERROR", metadata={"duration": duration, "error": str(exc_val)})
         
         # Reset context variables
-        for token in reversed(self._tokens):
-            if token:
-                if session_context == token.var: session_context.reset(token)
-                elif order_context == token.var: order_context.reset(token)
-                elif step_context == token.var: step_context.reset(token)
+        for var, token in reversed(self._tokens):
+            var.reset(token)
+        self._tokens = []
 
         return False  # Don't suppress exceptions
     
@@ -208,7 +303,7 @@ class AutomationLogger:
         token = step_context.set(step)
         try:
             # Log to standard logger
-            log_func = getattr(self.logger, level.lower())
+            log_func = getattr(self.logger, self._LEVEL_METHODS.get(level) or level.lower())
             log_func(message)
             
             # Explicitly save to DB
@@ -66,59 +66,188 @@
 WebSocket Manager for Real-time Log Streaming
 """
 
-from typing import List, Dict, Any
+from typing import Set, Dict, Any, Optional, Union
 from fastapi import WebSocket
 from datetime import datetime
-import json
 import asyncio
+import orjson
 from app.utils.logger import get_logger
 
 logger = get_logger("websocket")
 
+# Shared (never mutated) metadata for log events that carry none; events are only ever serialized
+_NO_METADATA: Dict[str, Any] = {}
+
 
 class WebSocketManager:
     """
     Manages WebSocket connections for real-time log streaming
     """
     
+    # Events queued within this window go out together as one frame
+    COALESCE_WINDOW = 0.02  # seconds
+    # Per-client send timeout, and frames a client may have pending before it is dropped as too slow
+    SEND_TIMEOUT = 2.0  # seconds
+    OUTBOX_SIZE = 256
+    # Outbound queue bound (oldest events are dropped beyond it) and max events per frame
+    MAX_QUEUED_EVENTS = 1000
+    MAX_BATCH_EVENTS = 64
+    
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
         self._lock = asyncio.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+        # Per-connection outbox and the writer task draining it
+        self._outboxes: Dict[WebSocket, asyncio.Queue] = {}
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
+        # Close tasks for dropped clients, referenced until done so they aren't garbage-collected mid-close
+        self._closers: Set[asyncio.Task] = set()
     
-    async def connect(self, websocket: WebSocket):
-        """Connect a new WebSocket client"""
+    async def connect(self, websocket: WebSocket, greeting: Optional[Dict[str, Any]] = None):
+        """Connect a new WebSocket client; `greeting` is its first frame, sent by its writer like everything else"""
         await websocket.accept()
         async with self._lock:
-            self.active_connections.append(websocket)
+            outbox = asyncio.Queue(maxsize=self.OUTBOX_SIZE)
+            if greeting is not None:
+                outbox.put_nowait(orjson.dumps(greeting))
+            self._outboxes[websocket] = outbox
+            self._writers[websocket] = asyncio.create_task(self._writer_loop(websocket, outbox))
+            self.active_connections.add(websocket)
         logger.info(f"[WS] Client connected. Total connections: {len(self.active_connections)}")
     
     async def disconnect(self, websocket: WebSocket):
         """Disconnect a WebSocket client"""
         async with self._lock:
-            if websocket in self.active_connections:
-                self.active_connections.remove(websocket)
+            self._forget(websocket)
         logger.info(f"[WS] Client disconnected. Total connections: {len(self.active_connections)}")
     
-    async def broadcast(self, message: str):
-        """Broadcast message to all connected clients"""
-        if not self.active_connections:
+    def _forget(self, websocket: WebSocket):
+        """Drop a client and stop its writer (caller holds the lock)"""
+        self.active_connections.discard(websocket)
+        self._outboxes.pop(websocket, None)
+        writer = self._writers.pop(websocket, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+    
+    async def _writer_loop(self, websocket: WebSocket, outbox: asyncio.Queue):
+        """Sends one client's frames in order; a failure only ever affects this client"""
+        try:
+            while True:
+                payload = await outbox.get()
+                await asyncio.wait_for(websocket.send_bytes(payload), timeout=self.SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to send to client: {e}")
+            async with self._lock:
+                self._forget(websocket)
+            logger.info(f"[WS] Removed disconnected client. Total connections: {len(self.active_connections)}")
+    
+    async def broadcast(self, message: Union[str, bytes]):
+        """
+        Broadcast message to all connected clients.
+        Sent as one binary frame of UTF-8 JSON: encoded here once, not per client.
+        Only queues the frame on each client's outbox, so a slow client never delays the others.
+        """
+        if not self._outboxes:
             return
         
-        disconnected = []
-        for connection in self.active_connections[:]:  # Create a copy to iterate
+        payload = message.encode("utf-8") if isinstance(message, str) else message
+        too_slow = []
+        for websocket, outbox in list(self._outboxes.items()):
             try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.warning(f"Failed to send to client: {e}")
-                disconnected.append(connection)
+                outbox.put_nowait(payload)
+            except asyncio.QueueFull:
+                too_slow.append(websocket)
         
-        # Remove disconnected clients
-        if disconnected:
+        # Clients that fell OUTBOX_SIZE frames behind are dropped and closed (the frontend reconnects)
+        if too_slow:
             async with self._lock:
-                for conn in disconnected:
-                    if conn in self.active_connections:
-                        self.active_connections.remove(conn)
-            logger.info(f"[WS] Removed {len(disconnected)} disconnected clients")
+                for websocket in too_slow:
+                    self._forget(websocket)
+            for websocket in too_slow:
+                closer = asyncio.create_task(self._close_quietly(websocket))
+                self._closers.add(closer)
+                closer.add_done_callback(self._closers.discard)
+            logger.warning(f"[WS] Dropped {len(too_slow)} clients that fell behind")
+    
+    async def _close_quietly(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=1013), timeout=self.SEND_TIMEOUT)
+        except Exception:
+            pass
+    
+    def enqueue(self, message: Dict[str, Any]):
+        """
+        Queue an event for the coalescing sender (must be called from the event loop thread).
+        Events that arrive within COALESCE_WINDOW are sent as one {"type": "batch", "events": [...]} frame,
+        a lone event is sent as-is. Dropped when no client is connected.
+        """
+        if not self.active_connections:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.MAX_QUEUED_EVENTS)
+        if self._sender is None or self._sender.done():
+            self._sender = asyncio.get_running_loop().create_task(self._send_loop())
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Clients can't keep up: drop the oldest event rather than grow without bound
+            self._queue.get_nowait()
+            self._queue.put_nowait(message)
+    
+    async def _send_loop(self):
+        while True:
+            events = [await self._queue.get()]
+            # Collect until the window closes or the frame is full, whichever comes first
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.COALESCE_WINDOW
+            while len(events) < self.MAX_BATCH_EVENTS:
+                if not self._queue.empty():
+                    events.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    events.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            payload = events[0] if len(events) == 1 else {"type": "batch", "events": events}
+            try:
+                # Serialized and encoded once for every connection
+                await self.broadcast(orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS))
+            except Exception as e:
+                logger.warning(f"Failed to broadcast {len(events)} queued events: {e}")
+    
+    def queue_log(
+        self,
+        level: str,
+        message: str,
+        session_id: str = None,
+        order_id: str = None,
+        step: str = None,
+        metadata: Dict[str, Any] = None
+    ):
+        """Synchronous send_log for logging handlers: queues the event without creating a task"""
+        # Nobody listening: skip building the event
+        if not self.active_connections:
+            return
+        
+        log_data = {
+            "type": "log",
+            "timestamp": datetime.now(),  # serialized natively by orjson
+            "level": level,
+            "message": message,
+            "session_id": session_id,
+            "order_id": order_id,
+            "step": step,
+            "metadata": metadata or _NO_METADATA
+        }
+        
+        self.enqueue(log_data)
     
     async def send_log(
         self,
@@ -140,18 +269,7 @@ class WebSocketManager:
             step: Current step (INIT, AUTH, CART, CHECKOUT, etc.)
             metadata: Additional metadata
         """
-        log_data = {
-            "type": "log",
-            "timestamp": datetime.now().isoformat(),
-            "level": level,
-            "message": message,
-            "session_id": session_id,
-            "order_id": order_id,
-            "step": step,
-            "metadata": metadata or {}
-        }
-        
-        await self.broadcast(json.dumps(log_data))
+        self.queue_log(level, message, session_id, order_id, step, metadata)
     
     async def send_order_update(
         self,
@@ -174,20 +292,23 @@ class WebSocketManager:
             total: Order total amount
             error: Error message (if failed)
         """
+        # Nobody listening: skip building the event
+        if not self.active_connections:
+            return
+        
         update_data = {
             "type": "order_update",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),  # serialized natively by orjson
             "order_id": order_id,
             "status": status,
             "session_id": session_id,
-            "session_id": session_id,
             "tira_order_number": tira_order_number,
             "total": total,
             "batch_id": batch_id,
             "error": error
         }
         
-        await self.broadcast(json.dumps(update_data))
+        self.enqueue(update_data)
     
     async def send_progress(
         self,
@@ -207,9 +328,13 @@ class WebSocketManager:
             completed_steps: Number of completed steps
             message: Optional progress message
         """
+        # Nobody listening: skip building the event
+        if not self.active_connections:
+            return
+        
         progress_data = {
             "type": "progress",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),  # serialized natively by orjson
             "session_id": session_id,
             "current_step": current_step,
             "total_steps": total_steps,
@@ -218,7 +343,7 @@ class WebSocketManager:
             "message": message
         }
         
-        await self.broadcast(json.dumps(progress_data))
+        self.enqueue(progress_data)
     
     def get_connection_count(self) -> int:
         """Get current number of active connections"""
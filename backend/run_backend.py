@@ -21,12 +21,20 @@ if __name__ == "__main__":
     if sys.platform == 'win32':
         print("Detected Windows environment: Using ProactorEventLoop for Playwright compatibility")
         asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+        loop_kind = "asyncio"
+    else:
+        # libuv-based loop for faster socket I/O (installed with uvicorn[standard])
+        try:
+            import uvloop  # noqa: F401
+            loop_kind = "uvloop"
+        except ImportError:
+            loop_kind = "asyncio"
     
     uvicorn.run(
         "app.main:app",
         host=HOST,
         port=PORT,
         reload=False,
-        loop="asyncio",
+        loop=loop_kind,
         log_level="info"
     )
@@ -15,6 +15,22 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 NAMES_JSON_PATH = os.path.join(BASE_DIR, "names.json")
 COOKIES_JSON_PATH = os.path.join(BASE_DIR, "cookies.json")
 
+# Default automation_config rows: (key, value, value_type, description)
+DEFAULT_CONFIG = [
+    ('max_concurrent_browsers', '5', 'integer', 'Maximum number of concurrent browser sessions'),
+    ('headless_mode', 'false', 'boolean', 'Run browsers in headless mode'),
+    ('default_delay_min', '2.0', 'float', 'Minimum delay in seconds'),
+    ('default_delay_max', '5.0', 'float', 'Maximum delay in seconds'),
+    ('session_timeout', '1800000', 'integer', 'Session timeout in milliseconds'),
+    ('max_retries', '3', 'integer', 'Maximum number of retries for failed operations'),
+]
+
+INSERT_CONFIG_SQL = """
+INSERT INTO automation_config (key, value, value_type, description)
+VALUES ($1, $2, $3, $4)
+ON CONFLICT (key) DO NOTHING
+"""
+
 SCHEMA_SQL = """
 -- Enable UUID extension for generating unique IDs
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
@@ -134,7 +150,9 @@ CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
 CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_orders_tira_order_number ON orders(tira_order_number);
 CREATE INDEX IF NOT EXISTS idx_orders_payment_method ON orders(payment_method);
-CREATE INDEX IF NOT EXISTS idx_orders_batch_id ON orders(batch_id);
+-- Serves batch lookups/deletes and the batch history GROUP BY (matches its WHERE batch_id IS NOT NULL)
+DROP INDEX IF EXISTS idx_orders_batch_id;
+CREATE INDEX IF NOT EXISTS idx_orders_batch_id_created ON orders(batch_id, created_at DESC) WHERE batch_id IS NOT NULL;
 
 
 -- =====================================================
@@ -175,7 +193,7 @@ CREATE TABLE IF NOT EXISTS logs (
     
     -- Context
     session_id VARCHAR(100),
-    order_id UUID REFERENCES orders(id) ON DELETE SET NULL,
+    order_id UUID REFERENCES orders(id) ON DELETE CASCADE,
     
     -- Additional data
     extra_data JSONB,
@@ -192,6 +210,11 @@ CREATE INDEX IF NOT EXISTS idx_logs_session_id ON logs(session_id);
 CREATE INDEX IF NOT EXISTS idx_logs_order_id ON logs(order_id);
 CREATE INDEX IF NOT EXISTS idx_logs_logger_name ON logs(logger_name);
 
+-- Logs are deleted together with their order (migrates older ON DELETE SET NULL schemas)
+ALTER TABLE logs
+    DROP CONSTRAINT IF EXISTS logs_order_id_fkey,
+    ADD CONSTRAINT logs_order_id_fkey FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE;
+
 -- =====================================================
 -- 6. STATISTICS TABLE
 -- Daily/hourly aggregated statistics
@@ -239,15 +262,7 @@ CREATE TABLE IF NOT EXISTS automation_config (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
--- Insert default configurations
-INSERT INTO automation_config (key, value, value_type, description) VALUES
-    ('max_concurrent_browsers', '5', 'integer', 'Maximum number of concurrent browser sessions'),
-    ('headless_mode', 'false', 'boolean', 'Run browsers in headless mode'),
-    ('default_delay_min', '2.0', 'float', 'Minimum delay in seconds'),
-    ('default_delay_max', '5.0', 'float', 'Maximum delay in seconds'),
-    ('session_timeout', '1800000', 'integer', 'Session timeout in milliseconds'),
-    ('max_retries', '3', 'integer', 'Maximum number of retries for failed operations')
-ON CONFLICT (key) DO NOTHING;
+-- Default configurations are seeded by init_db() (DEFAULT_CONFIG)
 
 -- =====================================================
 -- 8. TIRA_USERS TABLE
@@ -266,7 +281,7 @@ CREATE TABLE IF NOT EXISTS tira_users (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX IF NOT EXISTS idx_tira_users_email ON tira_users(email);
+-- Unique email/phone keys for the bulk upsert are created by init_schema() (create_user_key_indexes)
 CREATE INDEX IF NOT EXISTS idx_tira_users_is_active ON tira_users(is_active);
 
 -- =====================================================
@@ -351,6 +366,25 @@ CREATE TRIGGER update_admins_updated_at BEFORE UPDATE ON admins
 DROP TRIGGER IF EXISTS update_credit_cards_updated_at ON credit_cards;
 CREATE TRIGGER update_credit_cards_updated_at BEFORE UPDATE ON credit_cards
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Function to unset the previous default row before a new default is written
+-- (the partial unique index on is_default still guards concurrent writers)
+CREATE OR REPLACE FUNCTION clear_previous_default()
+RETURNS TRIGGER AS $$
+BEGIN
+    EXECUTE format('UPDATE %I SET is_default = false WHERE is_default = true AND id <> $1', TG_TABLE_NAME)
+    USING NEW.id;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS clear_addresses_default ON addresses;
+CREATE TRIGGER clear_addresses_default BEFORE INSERT OR UPDATE OF is_default ON addresses
+    FOR EACH ROW WHEN (NEW.is_default) EXECUTE FUNCTION clear_previous_default();
+
+DROP TRIGGER IF EXISTS clear_credit_cards_default ON credit_cards;
+CREATE TRIGGER clear_credit_cards_default BEFORE INSERT OR UPDATE OF is_default ON credit_cards
+    FOR EACH ROW WHEN (NEW.is_default) EXECUTE FUNCTION clear_previous_default();
 """
 
 async def populate_data(conn):
@@ -365,13 +399,14 @@ async def populate_data(conn):
             
             if names and isinstance(names, list):
                 logger.info(f"Inserting {len(names)} dummy names...")
-                # Use executemany for efficiency if possible, but asyncpg uses executemany with a different syntax or simple loops
-                # Efficient bulk insert with asyncpg:
-                await conn.copy_records_to_table(
-                    'dummy_names',
-                    records=[(name,) for name in names],
-                    columns=['name']
-                )
+                # Efficient bulk insert with asyncpg: COPY streams rows from the generator, no intermediate list
+                # Savepoint, so a failed COPY (logged below) doesn't abort the surrounding init transaction
+                async with conn.transaction():
+                    await conn.copy_records_to_table(
+                        'dummy_names',
+                        records=((name,) for name in names),
+                        columns=['name']
+                    )
                 logger.info("Dummy names populated.")
             else:
                 logger.warning("names.json is empty or invalid format.")
@@ -411,6 +446,67 @@ async def populate_data(conn):
     #     logger.warning(f"cookies.json not found at {COOKIES_JSON_PATH}")
 
 
+# Partial unique keys behind the bulk upsert's ON CONFLICT (email) / ON CONFLICT (phone)
+USER_KEY_COLUMNS = ('email', 'phone')
+
+
+async def create_user_key_indexes(conn):
+    """
+    Create the unique email/phone indexes, skipping (and reporting) a column whose existing rows
+    have duplicates, so one bad row doesn't roll back the rest of the init
+    """
+    for column in USER_KEY_COLUMNS:
+        if await conn.fetchval(f"SELECT to_regclass('public.uq_tira_users_{column}')"):
+            continue
+        try:
+            # Savepoint: a failure here only undoes this index
+            async with conn.transaction():
+                # Blank keys mean "none"; as NULLs they stay outside the partial index
+                await conn.execute(f"UPDATE tira_users SET {column} = NULL WHERE {column} = ''")
+                duplicates = await conn.fetch(f"""
+                    SELECT {column} AS value, COUNT(*) AS n FROM tira_users
+                    WHERE {column} IS NOT NULL GROUP BY {column} HAVING COUNT(*) > 1
+                    ORDER BY n DESC
+                """)
+                if duplicates:
+                    sample = ", ".join(f"{row['value']} (x{row['n']})" for row in duplicates[:10])
+                    logger.error(
+                        f"Not creating uq_tira_users_{column}: {len(duplicates)} duplicated {column} value(s) "
+                        f"in tira_users: {sample}. Merge or remove them and re-run init; "
+                        f"bulk upserts keyed on {column} fail until then."
+                    )
+                    if column == 'email':
+                        # Keep email lookups indexed meanwhile
+                        await conn.execute("CREATE INDEX IF NOT EXISTS idx_tira_users_email ON tira_users(email)")
+                    continue
+                await conn.execute(
+                    f"CREATE UNIQUE INDEX uq_tira_users_{column} ON tira_users({column}) WHERE {column} IS NOT NULL"
+                )
+                if column == 'email':
+                    # Superseded by the unique index
+                    await conn.execute("DROP INDEX IF EXISTS idx_tira_users_email")
+            logger.info(f"Created unique index on tira_users.{column}.")
+        except Exception as e:
+            logger.error(f"Failed to create unique index on tira_users.{column}: {e}")
+
+
+async def init_schema(conn):
+    """Create the schema and seed defaults/data on an open connection"""
+    # Schema, defaults and seed data in one transaction: a single commit, and nothing half-applied on failure
+    async with conn.transaction():
+        # Execute schema creation
+        await conn.execute(SCHEMA_SQL)
+        logger.info("Database schema initialized successfully.")
+        
+        await create_user_key_indexes(conn)
+        
+        # One prepared statement executed for every default row
+        await conn.executemany(INSERT_CONFIG_SQL, DEFAULT_CONFIG)
+        
+        # Populate data
+        await populate_data(conn)
+
+
 async def init_db():
     logger.info("Initializing database...")
     
@@ -421,16 +517,11 @@ async def init_db():
     
     try:
         conn = await asyncpg.connect(db_url)
-        logger.info("Connected to database.")
-        
-        # Execute schema creation
-        await conn.execute(SCHEMA_SQL)
-        logger.info("Database schema initialized successfully.")
-        
-        # Populate data
-        await populate_data(conn)
-        
-        await conn.close()
+        try:
+            logger.info("Connected to database.")
+            await init_schema(conn)
+        finally:
+            await conn.close()
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         raise
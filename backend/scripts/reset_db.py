@@ -1,6 +1,7 @@
 
 import asyncio
 import asyncpg
+import io
 import sys
 import os
 
@@ -8,94 +9,131 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.config import settings
-from scripts.init_db import init_db
+from scripts.init_db import init_schema
 from app.utils.logger import setup_logging, get_logger
 from urllib.parse import urlparse
 
 setup_logging()
 logger = get_logger("reset_db")
 
-async def reset_database():
-    db_url = settings.DATABASE_URL
-    if "+asyncpg" in db_url:
-        db_url = db_url.replace("+asyncpg", "")
-        
-    # Parse to get base URL (without db name) and db name
-    parsed = urlparse(db_url)
-    target_db = parsed.path.lstrip('/')
-    
-    # URL to connect to 'postgres' db for administration
-    admin_url = f"{parsed.scheme}://{parsed.username}:{parsed.password}@{parsed.hostname}:{parsed.port}/postgres"
-    
-    # Backup admins
-    admins_backup = []
+# DATABASE_URL is fixed for the process: derive the target database and the admin URL once
+_DB_URL = settings.DATABASE_URL.replace("+asyncpg", "")
+_PARSED = urlparse(_DB_URL)
+_TARGET_DB = _PARSED.path.lstrip('/')
+# URL to connect to 'postgres' db for administration
+_ADMIN_URL = f"{_PARSED.scheme}://{_PARSED.username}:{_PARSED.password}@{_PARSED.hostname}:{_PARSED.port}/postgres"
+
+def _quote_ident(name: str) -> str:
+    """Double-quote an identifier for DDL, which can't take bind parameters"""
+    if not name:
+        raise ValueError("Empty identifier")
+    return '"' + name.replace('"', '""') + '"'
+
+# Admin columns carried across a reset
+ADMIN_COLUMNS = ('username', 'email', 'password', 'is_active')
+
+# Staging table with the admins column types, so the binary COPY from the old database loads as-is
+CREATE_ADMIN_STAGING_SQL = """
+CREATE TEMP TABLE admins_restore ON COMMIT DROP AS
+SELECT username, email, password, is_active FROM admins WITH NO DATA
+"""
+
+# Upsert so a backed-up admin overrides init_db's default admin with the same username
+RESTORE_ADMIN_SQL = """
+INSERT INTO admins (username, email, password, is_active)
+SELECT username, email, password, is_active FROM admins_restore
+ON CONFLICT (username)
+DO UPDATE SET email = EXCLUDED.email, password = EXCLUDED.password, is_active = EXCLUDED.is_active
+"""
+
+async def _backup_admins(db_url):
+    """Return the current admins as a binary COPY buffer (None when there is nothing to restore)"""
     try:
-        logger.info(f"Connecting to '{target_db}' to backup admins...")
         conn = await asyncpg.connect(db_url)
-        # Check if admins table exists
-        table_exists = await conn.fetchval("SELECT to_regclass('public.admins')")
-        if table_exists:
-            # Fetch all admins, including ID to preserve it (optional, but good for references)
-            # Actually, let's keep it simple and just re-insert data. If ID is used elsewhere, we should preserve it.
-            # Assuming simple auth, username/email/password is key.
-            rows = await conn.fetch("SELECT username, email, password, is_active FROM admins")
-            admins_backup = [dict(row) for row in rows]
-            logger.info(f"Backed up {len(admins_backup)} admins.")
-        else:
-            logger.info("Admins table not found. Skipping backup.")
-        await conn.close()
+        try:
+            # One round trip answers both "does the table exist" and "is there anything to back up"
+            try:
+                has_admins = await conn.fetchval("SELECT EXISTS (SELECT 1 FROM admins)")
+            except asyncpg.UndefinedTableError:
+                logger.info("Admins table not found. Skipping backup.")
+                return None
+            if not has_admins:
+                logger.info("No admins to back up.")
+                return None
+            # Assuming simple auth, username/email/password is key; re-insert data rather than preserving IDs
+            # Binary COPY: rows stay in the wire format, nothing is decoded into Python objects
+            buf = io.BytesIO()
+            status = await conn.copy_from_query(
+                f"SELECT {', '.join(ADMIN_COLUMNS)} FROM admins", output=buf, format='binary'
+            )
+            logger.info(f"Backed up {status.split()[-1]} admins.")
+            buf.seek(0)
+            return buf
+        finally:
+            await conn.close()
     except Exception as e:
         logger.warning(f"Could not connect to database for backup (it might not exist): {e}")
+        return None
 
+
+async def reset_database():
+    # Quoted once up front and reused by every DDL statement below
+    db_ident = _quote_ident(_TARGET_DB)
+    owner_ident = _quote_ident(_PARSED.username)
+    
     try:
-        logger.info(f"Connecting to system database to reset '{target_db}'...")
-        conn = await asyncpg.connect(admin_url)
+        logger.info(f"Connecting to '{_TARGET_DB}' to backup admins and to the system database to reset it...")
+        # Different databases, so the backup query overlaps the admin connection handshake
+        admins_backup, conn = await asyncio.gather(_backup_admins(_DB_URL), asyncpg.connect(_ADMIN_URL))
         
-        # Terminate existing connections
-        logger.info(f"Terminating connections to '{target_db}'...")
-        await conn.execute(f"""
-            SELECT pg_terminate_backend(pid) 
-            FROM pg_stat_activity 
-            WHERE datname = '{target_db}' 
-            AND pid <> pg_backend_pid();
-        """)
-        
-        # Drop database
-        logger.info(f"Dropping database '{target_db}'...")
-        await conn.execute(f'DROP DATABASE IF EXISTS "{target_db}";')
+        if conn.get_server_version().major >= 13:
+            # Server terminates the connections itself: one round trip, and no window for new ones
+            logger.info(f"Dropping database '{_TARGET_DB}' (forcing off existing connections)...")
+            await conn.execute(f'DROP DATABASE IF EXISTS {db_ident} WITH (FORCE);')
+        else:
+            # Terminate existing connections
+            logger.info(f"Terminating connections to '{_TARGET_DB}'...")
+            await conn.execute("""
+                SELECT pg_terminate_backend(pid) 
+                FROM pg_stat_activity 
+                WHERE datname = $1 
+                AND pid <> pg_backend_pid();
+            """, _TARGET_DB)
+            
+            # Drop database
+            logger.info(f"Dropping database '{_TARGET_DB}'...")
+            await conn.execute(f'DROP DATABASE IF EXISTS {db_ident};')
         
         # Create database
-        logger.info(f"Creating database '{target_db}'...")
-        # Get owner from connection string
-        owner = parsed.username
-        await conn.execute(f'CREATE DATABASE "{target_db}" OWNER "{owner}";')
+        logger.info(f"Creating database '{_TARGET_DB}'...")
+        # Owner comes from the connection string
+        await conn.execute(f'CREATE DATABASE {db_ident} OWNER {owner_ident};')
         
         await conn.close()
         logger.info("Database reset successfully.")
         
-        # Run initialization
-        logger.info("Initializing schema and seeding data...")
-        await init_db()
-        logger.info("Schema initialized.")
-        
-        # Restore admins
-        if admins_backup:
-            logger.info("Restoring admins...")
-            conn = await asyncpg.connect(db_url)
-            # We use ON CONFLICT DO NOTHING to avoid duplicates with the default admin created by init_db
-            # If the backed up admin is the same as default, it's fine.
-            # If default admin has same username but different password, this might be tricky.
-            # For this script: Upsert or just insert.
-            
-            for admin in admins_backup:
-                await conn.execute("""
-                    INSERT INTO admins (username, email, password, is_active)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT (username) 
-                    DO UPDATE SET email = EXCLUDED.email, password = EXCLUDED.password, is_active = EXCLUDED.is_active
-                """, admin['username'], admin['email'], admin['password'], admin['is_active'])
+        # One connection to the new database for both schema init and the admin restore
+        conn = await asyncpg.connect(_DB_URL)
+        try:
+            # Run initialization
+            logger.info("Initializing schema and seeding data...")
+            await init_schema(conn)
+            logger.info("Schema initialized.")
             
-            logger.info(f"Restored {len(admins_backup)} admins.")
+            # Restore admins
+            if admins_backup is not None:
+                logger.info("Restoring admins...")
+                # Binary COPY into a staging table, then one upsert (keeps the ON CONFLICT semantics),
+                # in one transaction: a single commit, and a failure leaves no half-restored admins table
+                async with conn.transaction():
+                    # Rerunnable restore into a database we just recreated: skip waiting on the WAL flush
+                    await conn.execute("SET LOCAL synchronous_commit = off")
+                    await conn.execute(CREATE_ADMIN_STAGING_SQL)
+                    await conn.copy_to_table('admins_restore', source=admins_backup, format='binary')
+                    status = await conn.execute(RESTORE_ADMIN_SQL)
+                
+                logger.info(f"Restored {status.split()[-1]} admins.")
+        finally:
             await conn.close()
         
     except Exception as e:
@@ -104,15 +142,38 @@ async def reset_database():
              # Fallback if 'postgres' db doesn't exist (unlikely but possible)
             logger.warning("Could not connect to 'postgres' db. Trying 'template1'...")
             try:
-                admin_url = admin_url.replace("/postgres", "/template1")
-                conn = await asyncpg.connect(admin_url)
+                conn = await asyncpg.connect(_ADMIN_URL.replace("/postgres", "/template1"))
                 # ... repreat logic ... (omitted for brevity, assume postgres exists)
                 await conn.close()
             except Exception as e2:
                 logger.error(f"Fallback failed: {e2}")
         raise
 
+async def fast_reset():
+    """Warm reset: empty every table except admins and re-seed, keeping the existing schema"""
+    conn = await asyncpg.connect(_DB_URL)
+    try:
+        tables = await conn.fetch(
+            "SELECT tablename FROM pg_tables WHERE schemaname = 'public' AND tablename <> 'admins'"
+        )
+        # Truncate and re-seed atomically; admins are never touched, so no backup/restore is needed
+        async with conn.transaction():
+            if tables:
+                table_list = ', '.join(_quote_ident(row['tablename']) for row in tables)
+                logger.info(f"Truncating {len(tables)} tables in '{_TARGET_DB}'...")
+                await conn.execute(f"TRUNCATE {table_list} RESTART IDENTITY CASCADE")
+            
+            # Schema statements are idempotent; this brings back the default config and seed data
+            logger.info("Re-seeding data...")
+            await init_schema(conn)
+        logger.info("Database reset successfully (fast).")
+    finally:
+        await conn.close()
+
 if __name__ == "__main__":
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-    asyncio.run(reset_database())
+    # --fast: keep the schema and admins and just clear the data (e.g. between test runs)
+    # Runner closes the loop and runs finalizers before exit, so asyncpg sockets close cleanly
+    with asyncio.Runner() as runner:
+        runner.run(fast_reset() if "--fast" in sys.argv[1:] else reset_database())
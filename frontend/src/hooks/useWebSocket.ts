@@ -48,6 +48,9 @@ export function useWebSocket() {
 
       console.log('Connecting to WebSocket:', wsUrl);
       const socket = new WebSocket(wsUrl);
+      // Batched events arrive as binary frames of UTF-8 JSON
+      socket.binaryType = 'arraybuffer';
+      const decoder = new TextDecoder();
 
       socket.onopen = () => {
         console.log('✅ WebSocket connected successfully');
@@ -57,16 +60,22 @@ export function useWebSocket() {
 
       socket.onmessage = (event) => {
         try {
-          const data: LogMessage = JSON.parse(event.data);
+          const raw = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
+          const data = JSON.parse(raw);
+          // The backend coalesces bursts into { type: 'batch', events: [...] } frames
+          const messages: LogMessage[] = data.type === 'batch' ? data.events : [data];
 
           // Add timestamp if not present
-          if (!data.timestamp) {
-            data.timestamp = new Date().toISOString();
+          const now = new Date().toISOString();
+          for (const message of messages) {
+            if (!message.timestamp) {
+              message.timestamp = now;
+            }
           }
 
           setLogs((prev) => {
             // Keep last 500 logs to prevent memory issues
-            const newLogs = [...prev, data];
+            const newLogs = [...prev, ...messages];
             return newLogs.slice(-500);
           });
         } catch (e) {